@@ -2,9 +2,9 @@
 from participant import Participant
 from player import InjuryStatus
 from enum import Enum, auto
-from agent_model import AgentModel
+from agent_model import AgentModel, MODEL_DIRECTORY, LEGACY_MODEL_PATH
 
-import sys, copy, itertools, random, pickle, os
+import sys, copy, itertools, pickle, os
 
 class DifficultyMode(Enum):
 	DEBUG = "debug"
@@ -14,14 +14,24 @@ class DifficultyMode(Enum):
 
 # todo: delete this
 
-with open("./model_data/scorer.p", "rb") as f:
-	DEFAULT_MODEL = pickle.load(f)
+# loaded on first use, so leagues without agents never pay for it
+DEFAULT_MODEL = None
+
+def get_default_model():
+	global DEFAULT_MODEL
+	if DEFAULT_MODEL == None:
+		DEFAULT_MODEL = AgentModel.load(MODEL_DIRECTORY)
+	if DEFAULT_MODEL == None:
+		with open(LEGACY_MODEL_PATH, "rb") as f:
+			DEFAULT_MODEL = pickle.load(f)
+	return DEFAULT_MODEL
 
 class Agent(Participant):
 
 	def __init__(self, name, rules, team_name=None, autodraft=False):
 		super().__init__(name, rules, team_name, autodraft)
-		self.model = DEFAULT_MODEL
+		self.model = None
+		self.data = None
 		self.mode = DifficultyMode.DEBUG
 		self.cached_evaluations = {}
 
@@ -41,21 +51,50 @@ class Agent(Participant):
 	def is_a_person(self):
 		return False
 
+	def set_database(self, data):
+		self.data = data
+		if self.model != None:
+			self.model.set_database(data)
+
+	def get_model(self):
+		if self.model == None:
+			self.model = get_default_model()
+			if self.data != None:
+				self.model.set_database(self.data)
+		return self.model
+
+	def is_scouted(self, player):
+		return player.get_alias() != player.get_name() and player.get_scout_value() and player.get_games_started() == 0
+
+	def get_evaluation_key(self, player):
+		# aliases are handed out again every draft, so a scouted value is only reused for the exact report it was computed from
+		if self.is_scouted(player):
+			return ("scouted", player.get_alias()), player.get_scout_value()[0]
+		return ("known", player.get_name()), None
+
+	def evaluate_players(self, players):
+		keys = [self.get_evaluation_key(player) for player in players]
+		missing = {}
+		for player, (key, report) in zip(players, keys):
+			if key not in missing and (key not in self.cached_evaluations or self.cached_evaluations[key][0] is not report):
+				missing[key] = (player, report)
+
+		requests = []
+		for player, report in missing.values():
+			if not isinstance(report, type(None)):
+				requests.append((None, player.get_position(), player.get_scout_value()[1], report))
+			else:
+				requests.append((player.get_name(), player.get_position(), None, None))
+		for (key, (player, report)), value in zip(missing.items(), self.get_model().score_many(requests)):
+			self.cached_evaluations[key] = (report, value)
+
+		return [self.cached_evaluations[key][1] for key, report in keys]
+
 	def evaluate_player(self, player):
-		if player.get_alias() != player.get_name() and player.get_scout_value() and player.get_games_started() == 0:
-			sample, game_count = player.get_scout_value()
-			return DEFAULT_MODEL.score(name=None, position=player.get_position(), game_count=game_count, sample=sample)
-		else:
-			return DEFAULT_MODEL.score(name=player.get_name(), position=player.get_position(), game_count=None, sample=None)
+		return self.evaluate_players([player])[0]
 
 	def send_pick_to_commissioner(self, draftable_players):
-		values = {}
-		for player in draftable_players:
-			if player.get_alias() in self.cached_evaluations:
-				values[player] = self.cached_evaluations[player.get_alias()]
-			else:
-				values[player] = self.evaluate_player(player)
-				self.cached_evaluations[player.get_alias()] = values[player]
+		values = dict(zip(draftable_players, self.evaluate_players(draftable_players)))
 
 		max_player = None
 		max_value = -float("inf")
@@ -64,15 +103,15 @@ class Agent(Participant):
 				max_value = values[player]
 				max_player = player
 
-		print(max_player)
+		if not self.rules.is_headless():
+			print(max_player)
 		return max_player.get_name()
 
 	def set_lineup(self, year, games_out=0):
 		self.team.bench_everyone()
 
-		scores = {}
-		for player in self.team.get_all_players():
-			scores[player] = self.evaluate_player(player)
+		players = self.team.get_all_players()
+		scores = dict(zip(players, self.evaluate_players(players)))
 
 		sorted_list = sorted([(player, scores[player]) for player in scores], key=lambda x: x[1], reverse=True)
 		for i, (player, _) in enumerate(sorted_list):
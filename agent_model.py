@@ -1,40 +1,133 @@
 # NOTE: This is copied over from a jupyter notebook which is why it's super messy
 
-import os, pickle, json, random, time, math
+import os, sys, pickle, json, random, time, math, argparse
 
-import matplotlib.pyplot as plt
-from tqdm import tqdm
-import torch
-from scipy.stats import norm, truncnorm
-from sklearn.linear_model import LinearRegression
+# inference only needs numpy; the training dependencies are imported in __main__ below
 import numpy as np
 
-from data import Database, CumulativeGameData, GameData
-from rules import Rules
-
 NUM_FEATURES = 10
 
+MODEL_DIRECTORY = "./model_data/scorer"
+LEGACY_MODEL_PATH = "./model_data/scorer.p"
+MODEL_VERSION = 1
+MODEL_ARRAYS = ["names", "predicted_scores", "means", "stds", "positions"]
+
+def likelihood_stats(features):
+	# points, total rebounds, steals, assists and blocks: the stats a scouting sample is compared on
+	return np.stack([features[..., 0], features[..., 3] + features[..., 4], features[..., 5], features[..., 6], features[..., 7]], axis=-1)
+
+def likelihood_stds(stds):
+	return np.stack([stds[..., 0], np.sqrt(stds[..., 3] ** 2 + stds[..., 4] ** 2), stds[..., 5], stds[..., 6], stds[..., 7]], axis=-1)
+
 class AgentModel:
 
-	def __init__(self, predicted_scores, data, overall_dataset, stds, player_names, players_to_idxs):
+	def __init__(self, predicted_scores, data, overall_dataset, stds, player_names, players_to_idxs, names_to_positions=None, min_std=None):
 		self.predicted_scores = predicted_scores
 		self.data = data
 		self.overall_dataset = overall_dataset
 		self.stds = stds
 		self.player_names = player_names
 		self.players_to_idxs = players_to_idxs
+		self.min_std = min_std
+		self.build_position_index(names_to_positions)
+
+	@staticmethod
+	def load(model_path=MODEL_DIRECTORY, data=None):
+		meta_path = os.path.join(model_path, "meta.json")
+		if not os.path.exists(meta_path):
+			return None
+		with open(meta_path) as f:
+			meta = json.load(f)
+		if meta.get("version") != MODEL_VERSION or meta.get("features") != NUM_FEATURES:
+			print("Error: Agent model {} has version {} with {} features, expected version {} with {}".format(model_path, meta.get("version"), \
+				meta.get("features"), MODEL_VERSION, NUM_FEATURES))
+			return None
+
+		# memory-mapped, so starting a game reads only the pages the agents touch
+		arrays = {array: np.load(os.path.join(model_path, array + ".npy"), mmap_mode="r") for array in MODEL_ARRAYS}
+		names = arrays["names"].tolist()
+		return AgentModel(dict(zip(names, arrays["predicted_scores"].tolist())), data, arrays["means"], arrays["stds"], names, \
+			{name: i for i, name in enumerate(names)}, dict(zip(names, arrays["positions"].tolist())), meta.get("min_std"))
+
+	def save(self, model_path=MODEL_DIRECTORY):
+		arrays = {
+			"names": np.array(self.player_names, dtype=str),
+			"predicted_scores": np.array([self.predicted_scores[name] for name in self.player_names], dtype=np.float64),
+			"means": np.asarray(self.overall_dataset, dtype=np.float64)[[self.players_to_idxs[name] for name in self.player_names]],
+			"stds": self.get_stds(self.player_names),
+			"positions": np.array([self.get_position(name) for name in self.player_names], dtype=np.int64)
+		}
+
+		# imported here so loading a model for inference stays numpy-only
+		from data import write_array_directory
+		try:
+			write_array_directory(model_path, arrays, {"meta.json": json.dumps({"version": MODEL_VERSION, "features": NUM_FEATURES, "min_std": self.get_min_std()})}, replace=True)
+		except OSError as e:
+			print("Error: could not write agent model to {} ({})".format(model_path, e))
+			return False
+		return True
+
+	def set_database(self, data):
+		self.data = data
 
-	def generate_sample(self, player, num_games):
-		player_data = self.data.get_player_data(player)
-		
-		cumulative = CumulativeGameData()
-		for i in range(num_games):
-			cumulative.add(player_data.sample_game())
-		return cumulative
-
+	def get_min_std(self):
+		# models pickled before the floor existed use the unfloored stds
+		return getattr(self, "min_std", None)
+
+	def get_stds(self, names):
+		# models pickled before the slim format keep a tensor per player rather than one matrix
+		if isinstance(self.stds, dict):
+			return np.array([np.asarray(self.stds[name], dtype=np.float64) for name in names]).reshape(len(names), NUM_FEATURES)
+		return np.asarray(self.stds, dtype=np.float64)[[self.players_to_idxs[name] for name in names]]
+
+	def build_position_index(self, names_to_positions=None):
+		if isinstance(names_to_positions, type(None)):
+			names_to_positions = {name: self.data.get_player_position(name) for name in self.player_names}
+		self.names_to_positions = names_to_positions
+		self.positions_to_idxs = {}
+		for i, name in enumerate(self.player_names):
+			self.positions_to_idxs.setdefault(self.names_to_positions[name], []).append(i)
+
+	def get_position(self, name):
+		# models pickled before the position index existed build it on first use
+		if not hasattr(self, "names_to_positions"):
+			self.build_position_index()
+		return self.names_to_positions[name]
+
+	def get_candidate_idxs(self, position):
+		if not hasattr(self, "positions_to_idxs"):
+			self.build_position_index()
+		return self.positions_to_idxs.get(position, [])
 
-	def cumulative_game_data_to_tensor(self, game):
-		return torch.tensor([
+	def generate_sample(self, player, num_games):
+		return self.data.get_player_data(player).sample_games(num_games, cumulative=True)
+
+
+	def get_likelihood_arrays(self, position):
+		# built once per position, so each scouting report is a single array expression over the candidates
+		if not hasattr(self, "likelihood_arrays"):
+			self.likelihood_arrays = {}
+		if position not in self.likelihood_arrays:
+			names = [self.player_names[i] for i in self.get_candidate_idxs(position)]
+			rows = [self.players_to_idxs[name] for name in names]
+			features = np.asarray(self.overall_dataset, dtype=np.float64)[rows]
+			stds = likelihood_stds(self.get_stds(names))
+			if self.get_min_std() != None:
+				# a stat a player never varies in would otherwise give a zero-width likelihood
+				stds = np.maximum(stds, self.get_min_std())
+			self.likelihood_arrays[position] = (names, likelihood_stats(features), stds, self.get_score_array()[rows])
+		return self.likelihood_arrays[position]
+
+	def get_score_array(self):
+		# predicted scores laid out like the dataset rows, so known players are scored with one gather
+		if not hasattr(self, "score_array"):
+			self.score_array = np.zeros(len(self.players_to_idxs))
+			for name, idx in self.players_to_idxs.items():
+				self.score_array[idx] = self.predicted_scores[name]
+		return self.score_array
+
+	def cumulative_game_data_to_array(self, game):
+		return np.array([
 			game.get_points() / game.get_num_games(),
 			game.get_field_goals() / game.get_field_goal_attempts() if game.get_field_goal_attempts() > 0 else 0,
 			game.get_free_throws() / game.get_free_throw_attempts() if game.get_free_throw_attempts() > 0 else 0 ,
@@ -45,57 +138,31 @@ class AgentModel:
 			game.get_blocks() / game.get_num_games(),
 			game.get_turnovers() / game.get_num_games(),
 			game.get_personal_fouls() / game.get_num_games()
-		], dtype=torch.float)
+		], dtype=np.float64)
 
-	def cumulative_game_data_to_stdev_tensor(self, game):
-		stdev_map = game.get_stdevs()
-		return torch.tensor([
-			stdev_map["points"],
-			-1,
-			-1,
-			stdev_map["offensive_rebounds"],
-			stdev_map["defensive_rebounds"],
-			stdev_map["steals"],
-			stdev_map["assists"],
-			stdev_map["blocks"],
-			stdev_map["turnovers"],
-			stdev_map["personal_fouls"],
-		], dtype=torch.float)
+	def get_posteriors(self, position, game_count, samples):
+		# one row of candidate odds per sample, all evaluated as a single array expression
+		names, means, stds, _ = self.get_likelihood_arrays(position)
+		if len(names) == 0:
+			return np.zeros((len(samples), 0))
 
-	def get_odds(self, name, game_count, position=None, sample=None, should_print=False):
-	
-		def get_penalty(mean, std, sample_item):
-			dist = norm(loc=mean.item(), scale=(std.item() / math.sqrt(game_count)))
-			penalty = dist.logpdf(sample_item)
-			return penalty
+		scales = stds / math.sqrt(game_count)
+		sample_stats = likelihood_stats(np.array([self.cumulative_game_data_to_array(sample) for sample in samples]))
+		# like the per-player normal densities this replaced, a zero std gives nan odds rather than a warning
+		with np.errstate(divide="ignore", invalid="ignore"):
+			z_scores = (sample_stats[:, np.newaxis, :] - means) / scales
+			log_probs = (-0.5 * z_scores ** 2 - np.log(scales)).sum(axis=2) - (0.5 * math.log(2 * math.pi) * means.shape[1])
 
-		position = position if position else self.data.get_player_data(name).get_position()
-		sample = sample if sample else self.generate_sample(name, game_count)
-		sample_tensor = self.cumulative_game_data_to_tensor(sample)
-		
-		log_odds = {}
-		relative_odds = {}
-		total_odds = 0
-		for player in filter(lambda x: self.data.get_player_data(x).get_position() == position, self.player_names):
-			player_data = self.overall_dataset[self.players_to_idxs[player]]
-			std_to_use = self.stds[player]
-			
-			pt_penalty = get_penalty(player_data[0], std_to_use[0], sample_tensor[0]) # pts
-			trb_penalty = get_penalty(player_data[3] + player_data[4], (std_to_use[3]**2 + std_to_use[4]**2)**0.5, sample_tensor[3] + sample_tensor[4])
-			stl_penalty = get_penalty(player_data[5], std_to_use[5], sample_tensor[5]) # steals
-			ast_penalty = get_penalty(player_data[6], std_to_use[6], sample_tensor[6]) # asts
-			blk_penalty = get_penalty(player_data[7], std_to_use[7], sample_tensor[7]) # blocks
-			to_penalty = get_penalty(player_data[8], std_to_use[8], sample_tensor[8]) # turnovers
-			pf_penalty = get_penalty(player_data[9], std_to_use[9], sample_tensor[9]) # turnovers
+		# normalized in log space so a sample far from every candidate still ranks them instead of underflowing to zero
+		odds = np.exp(log_probs - log_probs.max(axis=1, keepdims=True))
+		return odds / odds.sum(axis=1, keepdims=True)
 
-			log_prob = pt_penalty + ast_penalty + trb_penalty + stl_penalty + blk_penalty
-			
-			log_odds[player] = math.exp(log_prob)
-			total_odds += log_odds[player]
+	def get_odds(self, name, game_count, position=None, sample=None, should_print=False):
+		position = position if position else self.get_position(name)
+		sample = sample if sample else self.generate_sample(name, game_count)
+		names = self.get_likelihood_arrays(position)[0]
+		relative_odds = dict(zip(names, self.get_posteriors(position, game_count, [sample])[0].tolist()))
 
-		for player in log_odds:
-			relative_odds[player] = log_odds[player] / total_odds if total_odds > 0 else 1 / len(self.player_names)
-		
 		if should_print:
 			print(sample)
 			sorted_list = sorted([(player, 100 * relative_odds[player]) for player in relative_odds], key=lambda x: x[1], reverse=True)
@@ -104,20 +171,54 @@ class AgentModel:
 		return relative_odds
 	
 	def score(self, name=None, position=None, game_count=None, sample=None):
-		if name:
-			return self.predicted_scores[name]
-		relative_odds = self.get_odds(name=None, game_count=game_count, position=position, sample=sample)
-		score = 0
-		for player in relative_odds:
-			score += (relative_odds[player] * self.predicted_scores[player])
-		return score
+		return self.score_many([(name, position, game_count, sample)])[0]
+
+	def score_many(self, players):
+		# players are (name, position, game_count, sample) like the arguments to score: known players by name, scouted ones by sample
+		scores = np.zeros(len(players))
+		known = []
+		scouted = {}
+		for i, (name, position, game_count, sample) in enumerate(players):
+			if name:
+				known.append(i)
+			else:
+				scouted.setdefault((position, game_count), []).append(i)
+
+		if len(known) > 0:
+			scores[known] = self.get_score_array()[[self.players_to_idxs[players[i][0]] for i in known]]
+		for (position, game_count), idxs in scouted.items():
+			odds = self.get_posteriors(position, game_count, [players[i][3] for i in idxs])
+			# multiplied and summed rather than a matmul, so a player scores the same alone as on a full board
+			scores[idxs] = (odds * self.get_likelihood_arrays(position)[3]).sum(axis=1)
+		return scores.tolist()
 
 if __name__ == '__main__':
+	import matplotlib.pyplot as plt
+	from tqdm import tqdm
+	import torch
+	from scipy.stats import norm, truncnorm
+	from sklearn.linear_model import LinearRegression
+
+	from data import Database, GameData
+	from rules import Rules
+
+	parser = argparse.ArgumentParser()
+	parser.add_argument("--convert", action="store_true", default=False, help="rewrite {} in the slim format and exit".format(LEGACY_MODEL_PATH))
+	args = parser.parse_args()
+
 	with open("./config.json") as f:
 		json_obj = json.load(f)
 	rules = Rules(json_obj)
 	data = Database(json_obj["Data Path"], rules, json_obj["Positional Data Path"])
 
+	if args.convert:
+		with open(LEGACY_MODEL_PATH, "rb") as f:
+			model = pickle.load(f)
+		# the pickled database may predate the current one, so the positions come from the live one
+		model.set_database(data)
+		model.save(MODEL_DIRECTORY)
+		sys.exit(0)
+
 
 	def cumulative_game_data_to_tensor(game):
 		return torch.tensor([
@@ -149,22 +250,25 @@ if __name__ == '__main__':
 		], dtype=torch.float)
 
 	def generate_data(rules, data):
-		players_to_idxs = {}
-		idxs_to_players = {}
-		players_to_stds = {}
-		overall_dataset = []
-		for i, player in enumerate(data.get_player_names()):
-			average_game = data.get_player_data(player).get_cumulative_game()
-			game_tensor = cumulative_game_data_to_tensor(average_game)
-			std = cumulative_game_data_to_stdev_tensor(average_game)
-			players_to_idxs[player] = i
-			idxs_to_players[i] = player
-			players_to_stds[player] = std
-			overall_dataset.append(game_tensor)
-		overall_dataset = torch.stack(overall_dataset)
+		# each player's averages and spreads are read straight from the database's summary table
+		summary = data.get_summary().loc[data.get_player_names()]
+
+		def per_attempt(made, attempts):
+			return np.where(summary[attempts] > 0, summary[made] / summary[attempts].where(summary[attempts] > 0, 1), 0)
+
+		unused = -np.ones(len(summary))
+		features = np.column_stack([summary["PTS"], per_attempt("FG", "FGA"), per_attempt("FT", "FTA"), summary["ORB"], summary["DRB"], summary["STL"], \
+			summary["AST"], summary["BLK"], summary["TOV"], summary["PF"]])
+		spreads = np.column_stack([summary["PTS STD"], unused, unused, summary["ORB STD"], summary["DRB STD"], summary["STL STD"], summary["AST STD"], \
+			summary["BLK STD"], summary["TOV STD"], summary["PF STD"]])
+
+		players_to_idxs = {player: i for i, player in enumerate(summary.index)}
+		idxs_to_players = {i: player for i, player in enumerate(summary.index)}
+		players_to_stds = {player: torch.tensor(spreads[i], dtype=torch.float) for i, player in enumerate(summary.index)}
+		overall_dataset = torch.tensor(features, dtype=torch.float)
 
 		mean = torch.mean(overall_dataset, dim=0)
-		normalized_dataset = (overall_dataset - mean) / std
+		normalized_dataset = (overall_dataset - mean) / players_to_stds[idxs_to_players[len(summary) - 1]]
 		return overall_dataset, normalized_dataset, idxs_to_players, players_to_idxs, mean, players_to_stds
 
 	overall_dataset, normalized_dataset, idxs_to_players, players_to_idxs, means, stds = generate_data(rules, data)
@@ -172,12 +276,7 @@ if __name__ == '__main__':
 	player_names = data.get_player_names()
 
 	def generate_sample(player, num_games):
-		player_data = data.get_player_data(player)
-		
-		cumulative = CumulativeGameData()
-		for i in range(num_games):
-			cumulative.add(player_data.sample_game())
-		return cumulative
+		return data.get_player_data(player).sample_games(num_games, cumulative=True)
 
 	def generate_batch(batch_size=64):
 		samples = []
@@ -198,14 +297,14 @@ if __name__ == '__main__':
 			penalty = dist.logpdf(sample_item)
 			return penalty
 
-		position = position if position else data.get_player_data(name).get_position()
+		position = position if position else data.get_player_position(name)
 		sample = sample if sample else generate_sample(name, game_count)
 		sample_tensor = cumulative_game_data_to_tensor(sample)
 		
 		log_odds = {}
 		relative_odds = {}
 		total_odds = 0
-		for player in filter(lambda x: data.get_player_data(x).get_position() == position, player_names):
+		for player in filter(lambda x: data.get_player_position(x) == position, player_names):
 			player_data = overall_dataset[players_to_idxs[player]]
 			std_to_use = stds[player]
 			
@@ -310,5 +409,4 @@ if __name__ == '__main__':
 
 	model = AgentModel(predicted_scores, data, overall_dataset, stds, player_names, players_to_idxs)
 
-	with open("./model_data/scorer.p", "wb") as f:
-		pickle.dump(model, f)
\ No newline at end of file
+	model.save(MODEL_DIRECTORY)
\ No newline at end of file
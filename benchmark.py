@@ -0,0 +1,447 @@
+from data import Database, GameData, CumulativeGameData, RotoGameData, STAT_COLUMNS, PLAY_BY_PLAY_COLUMNS, PLAY_BY_PLAY_SCALES, SeasonProfile
+from rules import Rules
+from participant import Participant
+from player import Player
+from matchup_center import MatchupCenter, BoxScore
+import pandas as pd
+import numpy as np
+import argparse, json, random, time, copy, os, sys, shutil, tempfile, tracemalloc, contextlib, subprocess
+
+def load_database(config_path):
+	with open(config_path) as f:
+		json_obj = json.load(f)
+	rules = Rules(json_obj)
+	return Database(json_obj["Data Path"], rules, json_obj["Positional Data Path"]), rules
+
+def rate(function, iterations):
+	start = time.perf_counter()
+	for i in range(iterations):
+		function()
+	return iterations / (time.perf_counter() - start)
+
+def report(label, baseline, optimized, unit):
+	print("{}: {:,.0f} -> {:,.0f} {} ({:.1f}x)".format(label, baseline, optimized, unit, optimized / baseline))
+
+def benchmark_sampling(data, rules, args):
+	names = data.get_player_names()
+	players = [data.get_player_data(name) for name in names]
+	frames = [pd.DataFrame(data.game_matrix[start:stop], columns=STAT_COLUMNS) for start, stop in [data.player_rows[name] for name in names]]
+	scoring_rules = rules.get_scoring_rules()
+
+	def legacy_sample():
+		frame = random.choice(frames)
+		return GameData(scoring_rules, copy.deepcopy(frame.iloc[random.randrange(len(frame))]))
+
+	def sample():
+		return random.choice(players).sample_game()
+
+	report("sample_game", rate(legacy_sample, args.iterations), rate(sample, args.iterations), "games/sec")
+
+def benchmark_loading(data, rules, args):
+	with open(args.config) as f:
+		json_obj = json.load(f)
+	cache_directory = tempfile.mkdtemp()
+
+	def read_all(filepaths):
+		# DataFrame.append one file at a time, as the original loader did (append itself is gone from newer pandas)
+		filepaths = [filepaths] if isinstance(filepaths, str) else filepaths
+		frame = pd.read_csv(filepaths[0], encoding="ISO-8859-1")
+		for extra_filepath in filepaths[1:]:
+			frame = pd.concat([frame, pd.read_csv(extra_filepath, encoding="ISO-8859-1")])
+		return frame
+
+	def legacy_load():
+		# the original Database: every column of every file parsed on each load, with nothing indexed
+		start = time.perf_counter()
+		games = read_all(json_obj["Data Path"])
+		if isinstance(json_obj["Data Path"], list):
+			games = games.dropna()
+		if json_obj["Positional Data Path"]:
+			read_all(json_obj["Positional Data Path"])
+		return 1 / (time.perf_counter() - start)
+
+	def load(cache):
+		start = time.perf_counter()
+		Database(json_obj["Data Path"], rules, json_obj["Positional Data Path"], cache_directory=cache_directory if cache else None)
+		return 1 / (time.perf_counter() - start)
+
+	legacy_rate = legacy_load()
+	report("Database load (csv, no cache)", legacy_rate, load(cache=False), "loads/sec")
+	load(cache=True)
+	report("Database load (warm cache)", legacy_rate, load(cache=True), "loads/sec")
+	shutil.rmtree(cache_directory)
+
+def benchmark_scoring(data, rules, args):
+	scoring_rules = rules.get_scoring_rules()
+	games = data.game_matrix[np.random.randint(len(data.game_matrix), size=args.iterations)]
+	wrapped_games = [GameData(scoring_rules, game) for game in games]
+
+	start = time.perf_counter()
+	[game.score() for game in wrapped_games]
+	scalar_rate = len(games) / (time.perf_counter() - start)
+
+	start = time.perf_counter()
+	GameData.score_batch(scoring_rules, games)
+	report("score", scalar_rate, len(games) / (time.perf_counter() - start), "games/sec")
+
+def benchmark_roto(data, rules, args):
+	scoring_rules = rules.get_scoring_rules()
+	games = data.game_matrix[np.random.randint(len(data.game_matrix), size=(2, args.iterations))]
+	wrapped_games = [(GameData(scoring_rules, game), GameData(scoring_rules, other)) for game, other in zip(games[0], games[1])]
+
+	start = time.perf_counter()
+	roto_stats, other_roto_stats = RotoGameData(), RotoGameData()
+	for game, other in wrapped_games:
+		game.score(other=other, roto=True)
+		other.score(other=game, roto=True)
+		roto_stats.add(game, other)
+		other_roto_stats.add(other, game)
+	scalar_rate = len(wrapped_games) / (time.perf_counter() - start)
+
+	start = time.perf_counter()
+	category_wins, other_category_wins = GameData.roto_category_wins(games[0], games[1])
+	RotoGameData().add_batch(GameData.roto_categories(games[0]), category_wins)
+	RotoGameData().add_batch(GameData.roto_categories(games[1]), other_category_wins)
+	report("roto matchups", scalar_rate, len(wrapped_games) / (time.perf_counter() - start), "games/sec")
+
+def benchmark_memory(data, rules, args):
+	player = data.get_player_data(data.get_player_names()[0])
+	for seasons in [1, 10]:
+		tracemalloc.start()
+		cumulative_game = CumulativeGameData()
+		for i in range(82 * seasons):
+			cumulative_game.add(player.sample_game())
+		print("CumulativeGameData after {} season(s): {:,} bytes".format(seasons, tracemalloc.get_traced_memory()[0]))
+		tracemalloc.stop()
+
+def benchmark_scouting(data, rules, args):
+	players = [data.get_player_data(name) for name in data.get_player_names()]
+	number_of_games = 8
+
+	def legacy_scout():
+		player = random.choice(players)
+		cumulative_game = CumulativeGameData()
+		for i in range(number_of_games):
+			cumulative_game.add(player.sample_game())
+		return cumulative_game
+
+	def scout():
+		return random.choice(players).sample_games(number_of_games, cumulative=True)
+
+	report("scouting report ({} games)".format(number_of_games), rate(legacy_scout, args.iterations // 10), rate(scout, args.iterations // 10), "reports/sec")
+
+def make_contenders(data, rules, lineup_size=6):
+	names = data.get_player_names()
+	contenders = []
+	for i in range(2):
+		participant = Participant("Benchmark {}".format(i + 1), rules)
+		for name in names[i * lineup_size:(i + 1) * lineup_size]:
+			participant.draft_player(Player(name, data.get_player_data(name), 3, roto=rules.is_roto()))
+		contenders.append(participant)
+	return contenders
+
+class LegacyPlayByPlayStats:
+	# the original play-by-play player data: every stat read draws its own season from the DataFrame
+
+	def __init__(self, seasons):
+		self.data = pd.DataFrame(np.column_stack([seasons[field] for field in SeasonProfile.FIELDS]) * np.array(PLAY_BY_PLAY_SCALES), columns=PLAY_BY_PLAY_COLUMNS)
+		self.num_seasons = len(seasons)
+
+	def get_usage_rate(self):
+		return self.data["USG%"].values[random.randrange(self.num_seasons)]
+
+	def get_three_point_attempt_rate(self):
+		return self.data["3PAr"].values[random.randrange(self.num_seasons)]
+
+	def get_three_point_percentage(self):
+		return self.data["3P%"].values[random.randrange(self.num_seasons)]
+
+	def get_two_point_percentage(self):
+		return self.data["2P%"].values[random.randrange(self.num_seasons)]
+
+	def get_offensive_rebound_percentage(self):
+		return self.data["ORB%"].values[random.randrange(self.num_seasons)] / 100
+
+	def get_defensive_rebound_percentage(self):
+		return self.data["DRB%"].values[random.randrange(self.num_seasons)] / 100
+
+	def get_assist_percentage(self):
+		return self.data["AST%"].values[random.randrange(self.num_seasons)] / 100
+
+	def get_defensive_bpm(self):
+		return self.data["DBPM"].values[random.randrange(self.num_seasons)] / 100
+
+	def get_turnover_percentage(self):
+		return self.data["TOV%"].values[random.randrange(self.num_seasons)] / 100
+
+class LegacyPlayByPlayPlayer:
+
+	def __init__(self, player):
+		self.name = player.get_name()
+		self.stats = LegacyPlayByPlayStats(player.get_stats().seasons)
+
+	def get_name(self):
+		return self.name
+
+	def get_stats(self):
+		return self.stats
+
+class LegacyPlayByPlayTeam:
+
+	def __init__(self, contender):
+		self.starters = [LegacyPlayByPlayPlayer(player) for player in contender.get_team().get_starters()]
+
+	def get_starters(self):
+		return self.starters
+
+def legacy_play_by_play_game(team_one, team_two, max_possessions=200):
+	# the original engine, possession by possession, kept as the baseline for the play-by-play benchmark
+
+	def choose_assister(team, shooter):
+		other_players = list(filter(lambda x: x != shooter, [player for player in team.get_starters()]))
+
+		prob_not_assisted = 1
+		for player in other_players:
+			prob_not_assisted *= (1 - player.get_stats().get_assist_percentage())
+
+		if random.random() < prob_not_assisted:
+			return None
+		else:
+			return random.choices(other_players, k=1, weights=[player.get_stats().get_assist_percentage() for player in other_players])[0]
+
+	def turnover(shooter):
+		return random.random() < shooter.get_stats().get_turnover_percentage()
+
+	def shot(shooter, assisted, defensive_bpm):
+		three_pointer = random.random() < shooter.get_stats().get_three_point_attempt_rate()
+		success_rate = shooter.get_stats().get_three_point_percentage() if three_pointer else shooter.get_stats().get_two_point_percentage()
+		success_rate = success_rate + (0.025 if three_pointer else 0.05) if assisted else success_rate - (0.025 if three_pointer else 0.05)
+		return random.random() - defensive_bpm < success_rate, three_pointer
+
+	def choose_shooter(team):
+		return random.choices(team.get_starters(), k=1, weights=[player.get_stats().get_usage_rate() for player in team.get_starters()])[0]
+
+	def rebound(offensive_team, defensive_team):
+		team_offensive_rebound_pct = 1
+		for player in offensive_team.get_starters():
+			team_offensive_rebound_pct *= (1 - player.get_stats().get_offensive_rebound_percentage())
+		team_offensive_rebound_pct = 1 - team_offensive_rebound_pct
+
+		team_defensive_rebound_pct = 1
+		for player in defensive_team.get_starters():
+			team_defensive_rebound_pct *= (1 - player.get_stats().get_defensive_rebound_percentage())
+		team_defensive_rebound_pct = 1 - team_defensive_rebound_pct
+
+		team_offensive_rebound_pct /= (team_offensive_rebound_pct + team_defensive_rebound_pct)
+		offensive_rebound = random.random() < team_offensive_rebound_pct
+
+		if offensive_rebound:
+			rebounder = random.choices(offensive_team.get_starters(), k=1, weights=[player.get_stats().get_offensive_rebound_percentage() for player in offensive_team.get_starters()])[0]
+			return rebounder, True
+		else:
+			rebounder = random.choices(defensive_team.get_starters(), k=1, weights=[player.get_stats().get_defensive_rebound_percentage() for player in defensive_team.get_starters()])[0]
+			return rebounder, False
+
+	def possession(offensive_team, defensive_team, offensive_team_box_score, defensive_team_box_score):
+		shooter = choose_shooter(offensive_team)
+		if turnover(shooter):
+			return defensive_team
+		assister = choose_assister(offensive_team, shooter)
+		defense_effect = sum([player.get_stats().get_defensive_bpm() for player in defensive_team.get_starters()]) / len(defensive_team.get_starters())
+		success, three_pointer = shot(shooter, isinstance(assister, LegacyPlayByPlayPlayer), defense_effect)
+		if not success:
+			rebounder, offensive_rebound = rebound(offensive_team, defensive_team)
+			offensive_team_box_score.add_rebound(rebounder) if offensive_rebound else defensive_team_box_score.add_rebound(rebounder)
+			return offensive_team if offensive_rebound else defensive_team
+		else:
+			offensive_team_box_score.add_points(shooter, 3 if three_pointer else 2)
+			offensive_team_box_score.add_assist(assister)
+			return defensive_team
+
+	team_one_box_score = BoxScore(team_one)
+	team_two_box_score = BoxScore(team_two)
+	offensive_team = team_one if random.random() < 0.5 else team_two
+	for possession_count in range(max_possessions):
+		if offensive_team == team_one:
+			offensive_team = possession(team_one, team_two, team_one_box_score, team_two_box_score)
+		else:
+			offensive_team = possession(team_two, team_one, team_two_box_score, team_one_box_score)
+	return team_one_box_score.score() > team_two_box_score.score()
+
+def benchmark_play_by_play(data, rules, args):
+	contender_one, contender_two = make_contenders(data, rules)
+	legacy_teams = (LegacyPlayByPlayTeam(contender_one), LegacyPlayByPlayTeam(contender_two))
+	legacy_rate = rate(lambda: legacy_play_by_play_game(*legacy_teams), max(1, args.iterations // 1000))
+	report("play_by_play_game", legacy_rate, rate(lambda: MatchupCenter.play_by_play_game(contender_one, contender_two), args.iterations // 20), "games/sec")
+
+	start = time.perf_counter()
+	MatchupCenter.play_by_play_games(contender_one, contender_two, args.iterations)
+	report("play_by_play_games (lockstep batch)", legacy_rate, args.iterations / (time.perf_counter() - start), "games/sec")
+
+def benchmark_segment(data, rules, args):
+	contender_one, contender_two = make_contenders(data, rules)
+	matchups = [(contender_one, contender_two)] * (args.iterations // 10)
+
+	start = time.perf_counter()
+	for first, second in matchups:
+		MatchupCenter.play_regular_game(first, second, roto=rules.is_roto())
+	scalar_rate = len(matchups) / (time.perf_counter() - start)
+
+	start = time.perf_counter()
+	MatchupCenter.play_regular_segment(matchups, rules.is_roto())
+	report("season segment", scalar_rate, len(matchups) / (time.perf_counter() - start), "games/sec")
+
+def benchmark_season(data, rules, args):
+	# imported here because agents load their model on import
+	from league import League
+
+	with open(args.config) as f:
+		json_obj = json.load(f)
+	for participant in json_obj["Participants"]:
+		participant["Autodraft"] = True
+	json_obj["Dramatic"] = False
+	config_file, config_path = tempfile.mkstemp(suffix=".json")
+	with os.fdopen(config_file, "w") as f:
+		json.dump(json_obj, f)
+
+	# draft picks are only issued for the first ten years of a league
+	number_of_seasons = min(10, max(1, args.iterations // 5000))
+
+	def run_seasons(headless):
+		league = League()
+		league.load_from_config(config_path)
+		league.set_headless(headless)
+		league.start_league()
+		start = time.perf_counter()
+		for year in range(number_of_seasons):
+			league.run_draft(year)
+			league.run_season([27, 54])
+			league.run_championship(dramatic=False)
+			league.end_season()
+		return number_of_seasons / (time.perf_counter() - start)
+
+	# the verbose run writes to a real file, as a redirected training log would; the same run into devnull shows how much of that is I/O
+	output_file, output_path = tempfile.mkstemp(suffix=".log")
+	with os.fdopen(output_file, "w") as output, contextlib.redirect_stdout(output):
+		verbose_rate = run_seasons(headless=False)
+	with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+		discarded_rate = run_seasons(headless=False)
+	headless_rate = run_seasons(headless=True)
+	print("verbose output: {:,} bytes per season".format(os.path.getsize(output_path) // number_of_seasons))
+	report("seasons (verbose to a file vs devnull)", verbose_rate, discarded_rate, "seasons/sec")
+	report("seasons", verbose_rate, headless_rate, "seasons/sec (headless)")
+	os.remove(output_path)
+	os.remove(config_path)
+
+def benchmark_startup(data, rules, args):
+	from agent_model import MODEL_DIRECTORY, LEGACY_MODEL_PATH
+	with open(args.config) as f:
+		json_obj = json.load(f)
+	if all(participant["Autodraft"] for participant in json_obj["Participants"]):
+		print("Skipping startup: play_game.py never prompts when every participant is an agent")
+		return
+	if not os.path.exists(MODEL_DIRECTORY) and not os.path.exists(LEGACY_MODEL_PATH):
+		print("Skipping startup: no model in {} or {}".format(MODEL_DIRECTORY, LEGACY_MODEL_PATH))
+		return
+
+	training_modules = ["matplotlib.pyplot", "tqdm", "torch", "scipy.stats", "sklearn.linear_model"]
+
+	# play_game.py runs in a fresh interpreter up to its first prompt, since this one has already imported everything
+	def time_to_first_prompt(eager_model):
+		code = "\n".join([
+			"import time, sys, os, builtins, runpy, importlib, json",
+			"start = time.perf_counter()",
+			"import league",
+			"league.League.load_from_config.__defaults__ = ({!r}, None, None)".format(args.config),
+			"timings = {'imports': 0.0, 'model': 0.0, 'missing': []}",
+			# the original agent_model.py imported its training libraries at module level and agent.py unpickled the model while being imported
+			"if {!r}:".format(eager_model),
+			"	import_start = time.perf_counter()",
+			"	for module in {!r}:".format(training_modules),
+			"		try:",
+			"			importlib.import_module(module)",
+			"		except ImportError:",
+			"			timings['missing'].append(module)",
+			"	model_start = time.perf_counter()",
+			"	timings['imports'] = model_start - import_start",
+			"	import agent, pickle",
+			("	agent.DEFAULT_MODEL = pickle.load(open({!r}, 'rb'))".format(LEGACY_MODEL_PATH) if os.path.exists(LEGACY_MODEL_PATH) else \
+				"	agent.get_default_model()"),
+			"	timings['model'] = time.perf_counter() - model_start",
+			"def first_prompt(*args):",
+			"	timings['total'] = time.perf_counter() - start",
+			"	timings['training'] = any(module in sys.modules for module in {!r})".format(training_modules),
+			"	print(json.dumps(timings))",
+			"	sys.stdout.flush()",
+			"	os._exit(0)",
+			"builtins.input = first_prompt",
+			"sys.argv = ['play_game.py']",
+			"runpy.run_path('play_game.py', run_name='__main__')"
+		])
+		return json.loads(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.splitlines()[-1])
+
+	eager = time_to_first_prompt(eager_model=True)
+	lazy = time_to_first_prompt(eager_model=False)
+	print("eager startup: {:.3f}s importing training libraries and {:.3f}s loading the model from {}".format(eager["imports"], eager["model"], \
+		LEGACY_MODEL_PATH if os.path.exists(LEGACY_MODEL_PATH) else MODEL_DIRECTORY))
+	if len(eager["missing"]) > 0:
+		print("Warn: {} not installed, so the eager baseline leaves out their import cost".format(", ".join(eager["missing"])))
+	report("play_game.py time to first prompt", 60 / eager["total"], 60 / lazy["total"], "startups/min (lazy model, {}training dependencies imported)".format( \
+		"" if lazy["training"] else "no "))
+
+def benchmark_draft_board(data, rules, args):
+	from agent_model import AgentModel, MODEL_DIRECTORY
+	model = AgentModel.load(MODEL_DIRECTORY, data)
+	if model == None:
+		print("Skipping draft board: no model in {}".format(MODEL_DIRECTORY))
+		return
+
+	# half the board is scouted, as in a draft where only some players have a scouting report
+	board = []
+	for i, name in enumerate(data.get_player_names()[:200]):
+		player = Player(name, data.get_player_data(name), 3, roto=True)
+		if i % 2 == 0:
+			player.generate_scouting_report(8)
+			sample, game_count = player.get_scout_value()
+			board.append((None, player.get_position(), game_count, sample))
+		else:
+			board.append((name, player.get_position(), None, None))
+
+	iterations = max(1, args.iterations // 2000)
+	report("{}-player draft board".format(len(board)), rate(lambda: [model.score(*player) for player in board], iterations), \
+		rate(lambda: model.score_many(board), iterations), "boards/sec")
+
+# name -> (benchmark, whether it needs a play-by-play config)
+BENCHMARKS = {
+	"sampling": (benchmark_sampling, False),
+	"loading": (benchmark_loading, False),
+	"scoring": (benchmark_scoring, False),
+	"roto": (benchmark_roto, False),
+	"memory": (benchmark_memory, False),
+	"scouting": (benchmark_scouting, False),
+	"segment": (benchmark_segment, False),
+	"season": (benchmark_season, False),
+	"play_by_play": (benchmark_play_by_play, True),
+	"startup": (benchmark_startup, False),
+	"draft_board": (benchmark_draft_board, False),
+}
+
+if __name__ == "__main__":
+
+	parser = argparse.ArgumentParser()
+	parser.add_argument("benchmarks", nargs="*", default=list(BENCHMARKS.keys()), help="any of: {}".format(", ".join(BENCHMARKS.keys())))
+	parser.add_argument("--config", type=str, default="./config.json")
+	parser.add_argument("--iterations", type=int, default=20_000)
+	args = parser.parse_args()
+
+	for name in args.benchmarks:
+		if name not in BENCHMARKS:
+			parser.error("unknown benchmark {}".format(name))
+
+	data, rules = load_database(args.config)
+	for name in args.benchmarks:
+		benchmark, needs_play_by_play = BENCHMARKS[name]
+		if needs_play_by_play != rules.play_by_play_mode():
+			print("Skipping {}: needs a {} config".format(name, "play-by-play" if needs_play_by_play else "box score"))
+			continue
+		benchmark(data, rules, args)
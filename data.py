@@ -1,125 +1,429 @@
 import pandas as pd
 from functools import total_ordering
 from rules import Rules, ScoringRules
-import random, math, sys, copy
+import math, sys, os, json, hashlib, tempfile, shutil, copy
 import numpy as np
 
+STAT_COLUMNS = ["PTS", "FG", "FGA", "FT", "FTA", "ORB", "DRB", "STL", "AST", "BLK", "TOV", "PF"]
+POINTS, FIELD_GOALS, FIELD_GOAL_ATTEMPTS, FREE_THROWS, FREE_THROW_ATTEMPTS, OFFENSIVE_REBOUNDS, DEFENSIVE_REBOUNDS, \
+	STEALS, ASSISTS, BLOCKS, TURNOVERS, PERSONAL_FOULS = range(len(STAT_COLUMNS))
+ROTO_CATEGORIES = ["PTS", "FG%", "FT%", "ORB", "DRB", "STL", "AST", "BLK", "TOV", "PF"]
+ROTO_POINTS, ROTO_FIELD_GOAL_PCT, ROTO_FREE_THROW_PCT, ROTO_OFFENSIVE_REBOUNDS, ROTO_DEFENSIVE_REBOUNDS, ROTO_STEALS, ROTO_ASSISTS, ROTO_BLOCKS, ROTO_TURNOVERS, ROTO_PERSONAL_FOULS = range(len(ROTO_CATEGORIES))
+
+PLAY_BY_PLAY_COLUMNS = ["USG%", "3PAr", "3P%", "2P%", "ORB%", "DRB%", "AST%", "DBPM", "TOV%"]
+PLAY_BY_PLAY_SCALES = [1, 1, 1, 1, 100, 100, 100, 100, 100]
+POSITION_COLUMNS = ["Name", "Proper"]
+
+CACHE_DIRECTORY = "./game_logs/cache"
+CACHE_VERSION = 1
+CACHE_ARRAYS = ["games", "offsets", "names", "position_names", "positions"]
+
+def write_array_directory(path, arrays, extra_files=None, replace=False):
+	# everything is written to a scratch directory and renamed into place, so a half-written directory is never picked up
+	parent = os.path.dirname(os.path.abspath(path))
+	os.makedirs(parent, exist_ok=True)
+	scratch_path = tempfile.mkdtemp(dir=parent)
+	try:
+		for name, array in arrays.items():
+			np.save(os.path.join(scratch_path, name + ".npy"), array)
+		for name, contents in (extra_files if extra_files else {}).items():
+			with open(os.path.join(scratch_path, name), "w") as f:
+				f.write(contents)
+		if replace and os.path.exists(path):
+			shutil.rmtree(path)
+		os.rename(scratch_path, path)
+	except OSError:
+		shutil.rmtree(scratch_path, ignore_errors=True)
+		raise
+
 class Database:
 
-	def __init__(self, filepath, rules, positional_filepath=None):
+	def __init__(self, filepath, rules, positional_filepath=None, cache_directory=CACHE_DIRECTORY):
 		self.data = None
+		self.positions = None
+		self.rules = rules
+		self.filepath = filepath
+		self.positional_filepath = positional_filepath
+		self.cache_directory = cache_directory
+		self.cache_path = None
+		self.published = False
+
+		# the compiled cache only covers the box-score logs; play-by-play data is always read from csv
+		use_cache = cache_directory != None and not self.rules.play_by_play_mode()
+		cache_path = os.path.join(cache_directory, Database.fingerprint(filepath, positional_filepath)) if use_cache else None
+		if use_cache and self.load_cache(cache_path):
+			return
+
+		self.read_csvs(filepath, positional_filepath)
+		self.build_index()
+		if use_cache:
+			self.save_cache(cache_path)
+
+	def publish(self, cache_directory=None):
+		# moves the game matrix onto the memory-mapped cache, so every process that forks from or unpickles this database
+		# maps the same pages instead of holding its own copy
+		if self.rules.play_by_play_mode():
+			print("Warn: Play-by-play data is not cached, so it cannot be published")
+			return False
+
+		cache_directory = cache_directory if cache_directory != None else self.cache_directory
+		if self.cache_path == None and cache_directory == None:
+			print("Warn: This database was loaded without a cache directory, so it cannot be published")
+			return False
+
+		if self.cache_path == None:
+			# only the matrix is swapped for its memory-mapped copy; the index, summary and valid rows already describe the same data
+			cache_path = os.path.join(cache_directory, Database.fingerprint(self.filepath, self.positional_filepath))
+			games_path = os.path.join(cache_path, "games.npy")
+			if not os.path.exists(games_path):
+				self.save_cache(cache_path)
+			if not os.path.exists(games_path):
+				return False
+			game_matrix = np.load(games_path, mmap_mode="r")
+			if game_matrix.shape != self.game_matrix.shape:
+				print("Error: Game log cache {} does not match the loaded logs, so this database cannot be published".format(cache_path))
+				return False
+			self.game_matrix = game_matrix
+			self.cache_path = cache_path
+
+		self.published = True
+		return True
+
+	def __getstate__(self):
+		state = self.__dict__.copy()
+		if self.published:
+			# reattached from the cache on the other side, and valid rows are cheap to recompute
+			state["game_matrix"] = None
+			state["valid_rows"] = {}
+		return state
+
+	def __setstate__(self, state):
+		self.__dict__.update(state)
+		# databases pickled before publishing existed (such as the one inside a legacy agent model) have no flag
+		if state.get("published", False) and isinstance(self.game_matrix, type(None)):
+			games_path = os.path.join(self.cache_path, "games.npy")
+			if not os.path.exists(games_path):
+				print("Error: Published game log cache {} is missing".format(self.cache_path))
+				return
+			self.game_matrix = np.load(games_path, mmap_mode="r")
+
+	def read_csvs(self, filepath, positional_filepath):
+		stat_columns = PLAY_BY_PLAY_COLUMNS if self.rules.play_by_play_mode() else STAT_COLUMNS
 		if isinstance(filepath, str):
-			self.data = pd.read_csv(filepath, encoding="ISO-8859-1")
+			self.data = Database.read_csv_files([filepath], ["NAME"] + stat_columns)
 		elif isinstance(filepath, list):
-			self.data = pd.read_csv(filepath[0], encoding="ISO-8859-1")
-			for extra_filepath in range(1, len(filepath)):
-				self.data = self.data.append(pd.read_csv(filepath[extra_filepath], encoding="ISO-8859-1"))
-			self.data = self.data.dropna()
+			self.data = Database.read_csv_files(filepath, ["NAME"] + stat_columns).dropna()
+		self.data["NAME"] = self.data["NAME"].astype("category")
 
-		self.positions = None
 		if isinstance(positional_filepath, str):
-			self.positions = pd.read_csv(positional_filepath, encoding="ISO-8859-1")
+			self.positions = Database.read_csv_files([positional_filepath], POSITION_COLUMNS)
 		elif isinstance(positional_filepath, list):
-			self.positions = pd.read_csv(positional_filepath[0], encoding="ISO-8859-1")
-			for extra_filepath in range(1, len(positional_filepath)):
-				self.positions = self.positions.append(pd.read_csv(positional_filepath[extra_filepath], encoding="ISO-8859-1"))
+			self.positions = Database.read_csv_files(positional_filepath, POSITION_COLUMNS)
 
-		self.rules = rules
+	@staticmethod
+	def read_csv_files(filepaths, columns):
+		# reads every file once and concatenates once, keeping only the columns the engine reads
+		dtypes = {column: (str if column in ["NAME", "Name"] else np.float32) for column in columns}
+		frames = [pd.read_csv(filepath, encoding="ISO-8859-1", usecols=columns, dtype=dtypes) for filepath in filepaths]
+		return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+	def build_index(self):
+		# groups each player's rows into one contiguous block so a lookup is a slice instead of a scan of the whole table
+		codes, names = pd.factorize(self.data["NAME"])
+		named_rows = np.flatnonzero(codes >= 0)
+		order = named_rows[np.argsort(codes[named_rows], kind="stable")]
+		self.data = self.data.iloc[order]
+
+		offsets = np.zeros(len(names) + 1, dtype=np.int64)
+		np.cumsum(np.bincount(codes[named_rows], minlength=len(names)), out=offsets[1:])
+
+		position_names, positions = [], []
+		if not isinstance(self.positions, type(None)):
+			position_names, positions = self.positions["Name"].values, self.positions["Proper"].values
+
+		game_matrix = None
+		self.season_profiles = None
+		if not self.rules.play_by_play_mode():
+			game_matrix = np.ascontiguousarray(self.data[STAT_COLUMNS].to_numpy(dtype=np.float64))
+		else:
+			seasons = self.data[PLAY_BY_PLAY_COLUMNS].to_numpy(dtype=np.float64) / np.array(PLAY_BY_PLAY_SCALES)
+			self.season_profiles = np.rec.fromarrays(seasons.T, dtype=SeasonProfile.DTYPE)
+
+		self.set_index(names, offsets, position_names, positions, game_matrix)
+		# everything the engine reads now lives in the arrays above
+		self.data = None
+		self.positions = None
+
+	def set_index(self, names, offsets, position_names, positions, game_matrix):
+		self.player_names = np.asarray(names, dtype=object)
+		self.player_offsets = offsets
+		self.player_rows = {name: (offsets[i], offsets[i + 1]) for i, name in enumerate(self.player_names)}
+		self.player_indices = {name: i for i, name in enumerate(self.player_names)}
+
+		self.player_positions = {}
+		for name, position in zip(position_names, positions):
+			if name not in self.player_positions:
+				self.player_positions[name] = position
+
+		self.game_matrix = game_matrix
+		self.valid_rows = {}
+		self.playable_names = self.player_names
+		if not isinstance(self.game_matrix, type(None)):
+			self.build_summary()
+			self.find_playable_players()
+
+	def bind_rules(self, rules):
+		# the same loaded logs under another league's rules: the arrays are shared and only what depends on the rules is rebuilt
+		if rules.play_by_play_mode() != self.rules.play_by_play_mode():
+			print("Error: Cannot bind {} rules to a {} database".format("play-by-play" if rules.play_by_play_mode() else "box score", \
+				"play-by-play" if self.rules.play_by_play_mode() else "box score"))
+			return None
+
+		database = copy.copy(self)
+		database.rules = rules
+		database.valid_rows = {}
+		database.summary = None
+		if not isinstance(database.game_matrix, type(None)):
+			# the shared database already warned about its unplayable players when it was loaded
+			database.find_playable_players(already_reported=self.playable_names)
+		return database
+
+	def build_summary(self):
+		# per-player totals and squared deviations for every stat, computed with grouped reductions over the whole matrix
+		self.player_game_counts = np.diff(self.player_offsets)
+		self.player_sums = np.zeros((len(self.player_names), len(STAT_COLUMNS)))
+		self.player_m2 = np.zeros((len(self.player_names), len(STAT_COLUMNS)))
+		if len(self.game_matrix) > 0:
+			self.player_sums = np.add.reduceat(self.game_matrix, self.player_offsets[:-1], axis=0)
+			means = self.player_sums / self.player_game_counts[:, None]
+			self.player_m2 = np.add.reduceat((self.game_matrix - np.repeat(means, self.player_game_counts, axis=0)) ** 2, self.player_offsets[:-1], axis=0)
+		self.summary = None
+
+	def get_valid_rows(self, scoring_rules):
+		# rows stay grouped by player, so offsets into the valid rows give each player's valid games as one slice
+		if scoring_rules not in self.valid_rows:
+			rows = np.flatnonzero(GameData.valid_batch(scoring_rules, self.game_matrix))
+			self.valid_rows[scoring_rules] = (rows, np.searchsorted(rows, self.player_offsets))
+		return self.valid_rows[scoring_rules]
+
+	def find_playable_players(self, already_reported=None):
+		_, valid_offsets = self.get_valid_rows(self.rules.get_scoring_rules())
+		valid_game_counts = np.diff(valid_offsets)
+		self.playable_names = self.player_names[valid_game_counts > 0]
+		# always reported at load; a rebound copy only reports again when its rules leave out a different set, and never when headless
+		if not isinstance(already_reported, type(None)) and (self.rules.is_headless() or np.array_equal(self.playable_names, already_reported)):
+			return
+		for name in self.player_names[valid_game_counts == 0]:
+			print("Warn: {} has no valid games under these scoring rules and will be left out of the league".format(name))
+
+	def get_summary(self):
+		if isinstance(self.summary, type(None)):
+			means = self.player_sums / self.player_game_counts[:, None]
+			stdevs = np.sqrt(self.player_m2 / self.player_game_counts[:, None])
+			self.summary = pd.DataFrame(means, index=pd.Index(self.player_names, name="NAME"), columns=STAT_COLUMNS)
+			for i, column in enumerate(STAT_COLUMNS):
+				self.summary[column + " STD"] = stdevs[:, i]
+			self.summary["Games"] = self.player_game_counts
+			self.summary["Position"] = [int(self.player_positions[name]) if name in self.player_positions else np.nan for name in self.player_names]
+			self.summary["Expected Score"] = GameData.score_batch(self.rules.get_scoring_rules(), means)
+		return self.summary
+
+	@staticmethod
+	def fingerprint(filepath, positional_filepath):
+		def describe(paths):
+			paths = [paths] if isinstance(paths, str) else (paths if paths else [])
+			return [(os.path.abspath(path), os.stat(path).st_mtime_ns, os.stat(path).st_size) for path in paths]
+
+		key = json.dumps({
+			"version": CACHE_VERSION,
+			"data": describe(filepath),
+			# read_csvs only drops incomplete rows for a list of paths, so a single path and a one-item list compile differently
+			"drop_missing": isinstance(filepath, list),
+			"positions": describe(positional_filepath),
+			"columns": STAT_COLUMNS
+		})
+		return hashlib.sha256(key.encode("utf-8")).hexdigest()[:24]
+
+	def load_cache(self, cache_path):
+		if not all(os.path.exists(os.path.join(cache_path, array + ".npy")) for array in CACHE_ARRAYS):
+			return False
+
+		arrays = {array: np.load(os.path.join(cache_path, array + ".npy"), mmap_mode="r") for array in CACHE_ARRAYS}
+		positions = [position if not math.isnan(position) else None for position in arrays["positions"]]
+		self.set_index(arrays["names"].astype(object), np.array(arrays["offsets"]), arrays["position_names"].astype(object), positions, arrays["games"])
+		self.cache_path = cache_path
+		return True
+
+	def save_cache(self, cache_path):
+		positions = [float(position) if not isinstance(position, type(None)) and not pd.isna(position) else np.nan for position in self.player_positions.values()]
+		arrays = {
+			"games": self.game_matrix,
+			"offsets": self.player_offsets,
+			"names": np.array(self.player_names, dtype=str),
+			"position_names": np.array(list(self.player_positions.keys()), dtype=str),
+			"positions": np.array(positions, dtype=np.float64)
+		}
+
+		try:
+			write_array_directory(cache_path, arrays)
+		except OSError as e:
+			print("Warn: could not write game log cache to {} ({})".format(cache_path, e))
 
 	def get_player_names(self):
-		return self.data["NAME"].drop_duplicates().values
+		return self.playable_names.copy()
+
+	def get_player_position(self, player_name):
+		return int(self.player_positions[player_name])
 
 	def get_player_data(self, player_name):
+		start, stop = self.player_rows.get(player_name, (0, 0))
 		if not self.rules.play_by_play_mode():
-			return PlayerData(self.data[self.data["NAME"] == player_name], self.positions[self.positions["Name"] == player_name], self.rules.get_scoring_rules())
+			player_index = self.player_indices.get(player_name)
+			summary, valid_rows = None, None
+			if player_index != None:
+				rows, valid_offsets = self.get_valid_rows(self.rules.get_scoring_rules())
+				summary = (self.player_sums[player_index], self.player_m2[player_index])
+				valid_rows = rows[valid_offsets[player_index]:valid_offsets[player_index + 1]] - start
+			return PlayerData(self.game_matrix[start:stop], self.get_player_position(player_name), self.rules.get_scoring_rules(), summary, valid_rows, self.rules.get_generator("sampling"))
 		else:
-			return PlayByPlayPlayerData(self.data[self.data["NAME"] == player_name], self.positions[self.positions["Name"] == player_name])
+			return PlayByPlayPlayerData(self.season_profiles[start:stop], self.get_player_position(player_name), self.rules.get_generator("sampling"))
 
 class PlayerData:
 
-	def __init__(self, data, position, scoring_rules):
-		self.data = data
-		self.num_games = len(self.data["NAME"].values)
-		self.position = int(position["Proper"].values[0])
+	def __init__(self, games, position, scoring_rules, summary=None, valid_rows=None, generator=None):
+		self.games = games
+		self.num_games = len(self.games)
+		self.position = position
 		self.scoring_rules = scoring_rules
+		self.summary = summary
+		self.valid_rows = valid_rows
+		self.generator = generator if generator != None else np.random.default_rng()
 
 	def __len__(self):
 		return self.num_games
 
+	def get_scoring_rules(self):
+		return self.scoring_rules
+
+	def get_generator(self):
+		return self.generator
+
 	def sample_game(self):
-		game = GameData(self.scoring_rules, self.data.iloc[random.randrange(self.num_games)])
-		if not game.is_valid():
-			game = GameData(self.scoring_rules, self.data.iloc[random.randrange(self.num_games)])
-		return game
+		valid_rows = self.get_valid_rows()
+		return GameData(self.scoring_rules, self.games[valid_rows[self.generator.integers(len(valid_rows))]])
+
+	def get_valid_rows(self):
+		if isinstance(self.valid_rows, type(None)):
+			self.valid_rows = np.flatnonzero(GameData.valid_batch(self.scoring_rules, self.games))
+		if len(self.valid_rows) == 0:
+			# only players the database already reported as unplayable get here
+			self.valid_rows = np.arange(self.num_games)
+		return self.valid_rows
+
+	def sample_games(self, number_of_games, cumulative=False, generator=None):
+		valid_rows = self.get_valid_rows()
+		generator = generator if generator != None else self.generator
+		games = self.games[valid_rows[generator.integers(len(valid_rows), size=number_of_games)]]
+		if not cumulative:
+			return games
+
+		cumulative_game = CumulativeGameData(self.scoring_rules)
+		cumulative_game.add_batch(games)
+		return cumulative_game
 
 	def get_cumulative_game(self):
+		if not isinstance(self.summary, type(None)):
+			sums, m2 = self.summary
+			return CumulativeGameData.from_moments(self.num_games, sums, m2)
+
 		overall_game = CumulativeGameData()
-		for i in range(self.num_games):
-			overall_game.add(GameData(self.scoring_rules, self.data.iloc[i]))
+		for row in self.games:
+			overall_game.add(GameData(self.scoring_rules, row))
 		return overall_game
 
 	def get_position(self):
 		return self.position
 
+class SeasonProfile:
+
+	FIELDS = ["usage_rate", "three_point_attempt_rate", "three_point_percentage", "two_point_percentage", "offensive_rebound_percentage", \
+		"defensive_rebound_percentage", "assist_percentage", "defensive_bpm", "turnover_percentage"]
+	DTYPE = np.dtype([(field, np.float64) for field in FIELDS])
+
+	__slots__ = FIELDS
+
+	def __init__(self, season):
+		for field, value in zip(SeasonProfile.FIELDS, season):
+			setattr(self, field, value)
+
 class PlayByPlayPlayerData:
 
-	def __init__(self, data, position):
-		self.data = data
-		self.num_seasons = len(data)
-		self.position = int(position["Proper"].values_win_rate)
+	def __init__(self, seasons, position, generator=None):
+		self.seasons = seasons
+		self.num_seasons = len(seasons)
+		self.position = position
+		self.profile = None
+		self.generator = generator if generator != None else np.random.default_rng()
 
 	def get_position(self):
 		return self.position
 
+	def get_generator(self):
+		return self.generator
+
+	def sample_profile(self):
+		# one season is drawn per game so every possession in it sees the same version of the player
+		self.profile = SeasonProfile(self.seasons[self.generator.integers(self.num_seasons)].tolist())
+		return self.profile
+
+	def sample_profiles(self, number_of_games, generator=None):
+		generator = generator if generator != None else self.generator
+		return self.seasons[generator.integers(self.num_seasons, size=number_of_games)]
+
+	def get_profile(self):
+		return self.profile if not isinstance(self.profile, type(None)) else self.sample_profile()
+
 	def get_usage_rate(self):
-		return self.data["USG%"].values[random.randrange(self.num_seasons)]
+		return self.get_profile().usage_rate
 
 	def get_three_point_attempt_rate(self):
-		return self.data["3PAr"].values[random.randrange(self.num_seasons)]
+		return self.get_profile().three_point_attempt_rate
 
 	def get_three_point_percentage(self):
-		return self.data["3P%"].values[random.randrange(self.num_seasons)]
+		return self.get_profile().three_point_percentage
 
 	def get_two_point_percentage(self):
-		return self.data["2P%"].values[random.randrange(self.num_seasons)]
+		return self.get_profile().two_point_percentage
 
 	def get_offensive_rebound_percentage(self):
-		return self.data["ORB%"].values[random.randrange(self.num_seasons)] / 100
+		return self.get_profile().offensive_rebound_percentage
 
 	def get_defensive_rebound_percentage(self):
-		return self.data["DRB%"].values[random.randrange(self.num_seasons)] / 100
+		return self.get_profile().defensive_rebound_percentage
 
 	def get_assist_percentage(self):
-		return self.data["AST%"].values[random.randrange(self.num_seasons)] / 100
+		return self.get_profile().assist_percentage
 
 	def get_defensive_bpm(self):
-		return self.data["DBPM"].values[random.randrange(self.num_seasons)] / 100
+		return self.get_profile().defensive_bpm
 
 	def get_turnover_percentage(self):
-		return self.data["TOV%"].values[random.randrange(self.num_seasons)] / 100
+		return self.get_profile().turnover_percentage
 
 
 @total_ordering
 class GameData:
 
 	def __init__(self, scoring_rules=None, data=None):
-		if not isinstance(data, type(None)):
-			data = copy.deepcopy(data)
-
 		self.scoring_rules = scoring_rules
 
-		self.points = float(data["PTS"]) if not isinstance(data, type(None)) else 0
-		self.assists = float(data["AST"]) if not isinstance(data, type(None)) else 0
-		self.steals = float(data["STL"]) if not isinstance(data, type(None)) else 0
-		self.blocks = float(data["BLK"]) if not isinstance(data, type(None)) else 0
-		self.turnovers = float(data["TOV"]) if not isinstance(data, type(None)) else 0
-		self.field_goal_attempts = float(data["FGA"]) if not isinstance(data, type(None)) else 0
-		self.free_throw_attempts = float(data["FTA"]) if not isinstance(data, type(None)) else 0
-		self.field_goals = float(data["FG"]) if not isinstance(data, type(None)) else 0
-		self.free_throws = float(data["FT"]) if not isinstance(data, type(None)) else 0
-		self.offensive_rebounds = float(data["ORB"]) if not isinstance(data, type(None)) else 0
-		self.defensive_rebounds = float(data["DRB"]) if not isinstance(data, type(None)) else 0
-		self.personal_fouls = float(data["PF"]) if not isinstance(data, type(None)) else 0
+		# rows of a game matrix are wrapped as-is, so stats is never written in place; updates rebind it instead
+		if isinstance(data, np.ndarray):
+			self.stats = data
+		elif not isinstance(data, type(None)):
+			self.stats = np.array([float(data[column]) for column in STAT_COLUMNS])
+		else:
+			self.stats = np.zeros(len(STAT_COLUMNS))
 
 	def __eq__(self, other):
 		return self.score() == other.score()
@@ -128,51 +432,54 @@ class GameData:
 		return self.score() == other.score()
 
 	def __str__(self):
-		return "PTS: {} ORB: {} DRB: {} AST: {} BLK: {} STL: {} TO: {} FG%: {} FT%: {} PF: {}".format(self.points, self.offensive_rebounds, self.defensive_rebounds, \
-			self.assists, self.blocks, self.steals, self.turnovers, round(self.field_goals / self.field_goal_attempts, 2) if self.field_goal_attempts else 0, \
-			round(self.free_throws / self.free_throw_attempts, 2) if self.free_throw_attempts else 0, self.personal_fouls)
+		return "PTS: {} ORB: {} DRB: {} AST: {} BLK: {} STL: {} TO: {} FG%: {} FT%: {} PF: {}".format(self.get_points(), self.get_offensive_rebounds(), self.get_defensive_rebounds(), \
+			self.get_assists(), self.get_blocks(), self.get_steals(), self.get_turnovers(), round(self.get_field_goals() / self.get_field_goal_attempts(), 2) if self.get_field_goal_attempts() else 0, \
+			round(self.get_free_throws() / self.get_free_throw_attempts(), 2) if self.get_free_throw_attempts() else 0, self.get_personal_fouls())
 
 	def set_scoring_rules(self, scoring_rules):
 		self.scoring_rules = scoring_rules
 
+	def get_stats(self):
+		return self.stats
+
 	def get_points(self):
-		return self.points
+		return self.stats[POINTS]
 
 	def get_assists(self):
-		return self.assists
+		return self.stats[ASSISTS]
 
 	def get_steals(self):
-		return self.steals
+		return self.stats[STEALS]
 
 	def get_blocks(self):
-		return self.blocks
+		return self.stats[BLOCKS]
 
 	def get_turnovers(self):
-		return self.turnovers
+		return self.stats[TURNOVERS]
 
 	def get_field_goals(self):
-		return self.field_goals
+		return self.stats[FIELD_GOALS]
 
 	def get_field_goal_attempts(self):
-		return self.field_goal_attempts
+		return self.stats[FIELD_GOAL_ATTEMPTS]
 
 	def get_free_throw_attempts(self):
-		return self.free_throw_attempts
+		return self.stats[FREE_THROW_ATTEMPTS]
 
 	def get_offensive_rebounds(self):
-		return self.offensive_rebounds
+		return self.stats[OFFENSIVE_REBOUNDS]
 
 	def get_defensive_rebounds(self):
-		return self.defensive_rebounds
+		return self.stats[DEFENSIVE_REBOUNDS]
 
 	def get_free_throws(self):
-		return self.free_throws
+		return self.stats[FREE_THROWS]
 
 	def get_personal_fouls(self):
-		return self.personal_fouls
+		return self.stats[PERSONAL_FOULS]
 
 	def get_rebounds(self):
-		return self.defensive_rebounds + self.offensive_rebounds
+		return self.stats[DEFENSIVE_REBOUNDS] + self.stats[OFFENSIVE_REBOUNDS]
 
 	def score(self, other=None, roto=False):
 		if not isinstance(self.scoring_rules, ScoringRules):
@@ -182,141 +489,143 @@ class GameData:
 		return self.roto_score(other) if roto else self.standard_score()
 
 	def standard_score(self):
-		return (self.get_points() * self.scoring_rules.points_coeff()) + \
-					(self.get_field_goals() * self.scoring_rules.field_goals_coeff()) + \
-					(self.get_field_goal_attempts() * self.scoring_rules.field_goal_attempts_coeff()) + \
-					(self.get_free_throws() * self.scoring_rules.free_throws_coeff()) + \
-					(self.get_free_throw_attempts() * self.scoring_rules.free_throw_attempts_coeff()) + \
-					(self.get_offensive_rebounds() * self.scoring_rules.offensive_rebounds_coeff()) + \
-					(self.get_defensive_rebounds() * self.scoring_rules.defensive_rebounds_coeff()) + \
-					(self.get_steals() * self.scoring_rules.steals_coeff()) + \
-					(self.get_assists() * self.scoring_rules.assists_coeff()) + \
-					(self.get_blocks() * self.scoring_rules.blocks_coeff()) + \
-					(self.get_turnovers() * self.scoring_rules.turnovers_coeff()) + \
-					(self.get_personal_fouls() * self.scoring_rules.personal_fouls_coeff())
+		return float(GameData.score_batch(self.scoring_rules, self.stats))
 
 	def roto_score(self, other):
-
-		def roto_value(first, second):
-			return 1 if first > second else (0.5 if first == second else 0)
-
 		if not other:
 			print("Error: Other player cannot be None when calculating score")
 			return 0
 
-		score = (roto_value(self.get_points(), other.get_points()) * self.scoring_rules.points_coeff()) + \
-				(roto_value((self.get_field_goals() / self.get_field_goal_attempts()) if self.get_field_goal_attempts() else 0, \
-					(other.get_field_goals() / other.get_field_goal_attempts()) if other.get_field_goal_attempts() else 0) * self.scoring_rules.field_goals_coeff()) + \
-				(roto_value((self.get_free_throws() / self.get_free_throw_attempts()) if self.get_free_throw_attempts() else 0, \
-					(self.get_free_throws() / other.get_free_throw_attempts()) if other.get_free_throw_attempts() else 0) * self.scoring_rules.free_throws_coeff()) + \
-				(roto_value(self.get_offensive_rebounds(), other.get_offensive_rebounds()) * self.scoring_rules.offensive_rebounds_coeff()) + \
-				(roto_value(self.get_defensive_rebounds(), other.get_defensive_rebounds()) * self.scoring_rules.defensive_rebounds_coeff()) + \
-				(roto_value(self.get_steals(), other.get_steals()) * self.scoring_rules.steals_coeff()) + \
-				(roto_value(self.get_assists(), other.get_assists()) * self.scoring_rules.assists_coeff()) + \
-				(roto_value(self.get_blocks(), other.get_blocks()) * self.scoring_rules.blocks_coeff()) + \
-				(roto_value(self.get_turnovers(), other.get_turnovers()) * self.scoring_rules.turnovers_coeff()) + \
-				(roto_value(self.get_personal_fouls(), other.get_personal_fouls()) * self.scoring_rules.personal_fouls_coeff())
-
-		return score
+		category_wins, _ = GameData.roto_category_wins(self.stats, other.get_stats())
+		return float(category_wins[0] @ self.scoring_rules.roto_coefficient_vector())
+
+	def get_roto_categories(self):
+		return GameData.roto_categories(self.stats)[0]
 
 	def add(self, other_game):
-		self.points += other_game.get_points()
-		self.field_goals += other_game.get_field_goals()
-		self.field_goal_attempts += other_game.get_field_goal_attempts()
-		self.free_throws += other_game.get_free_throws()
-		self.free_throw_attempts += other_game.get_free_throw_attempts()
-		self.offensive_rebounds += other_game.get_offensive_rebounds()
-		self.defensive_rebounds += other_game.get_defensive_rebounds()
-		self.steals += other_game.get_steals()
-		self.assists += other_game.get_assists()
-		self.blocks += other_game.get_blocks()
-		self.turnovers += other_game.get_turnovers()
-		self.personal_fouls += other_game.get_personal_fouls()
+		self.stats = self.stats + other_game.get_stats()
 
 
 	def is_valid(self):
-		return not math.isnan(self.score()) and self.score() >= 0 and self.score() < 1000
+		score = self.score()
+		return not math.isnan(score) and score >= 0 and score < 1000
 
 	@staticmethod
-	def limit_game(game):
+	def score_batch(scoring_rules, games):
+		# multiply then sum along the row rather than a matrix product, so a row scores bit-for-bit the same alone or in a batch
+		return (games * scoring_rules.coefficient_vector()).sum(axis=-1)
 
-		game.points = game.get_points() * 0.8
-		game.assists = game.get_assists() * 0.8
-		game.steals = game.get_steals() * 0.8
-		game.blocks = game.get_blocks() * 0.8
-		game.field_goals_attempts = game.get_field_goal_attempts() * 0.8
-		game.turnovers = game.get_turnovers() * 0.8
-		game.free_throw_attempts = game.get_free_throw_attempts() * 0.8
-		game.offensive_rebounds = game.get_offensive_rebounds() * 0.8
-		game.defensive_rebounds = game.get_defensive_rebounds() * 0.8
-		game.field_goals = game.get_field_goals() * 0.8
-		game.free_throws = game.get_free_throws() * 0.8
-		game.personal_fouls = game.get_personal_fouls() * 0.8
+	@staticmethod
+	def roto_categories(games):
+		games = np.atleast_2d(games)
+		field_goal_pct = np.divide(games[:, FIELD_GOALS], games[:, FIELD_GOAL_ATTEMPTS], out=np.zeros(len(games)), where=games[:, FIELD_GOAL_ATTEMPTS] != 0)
+		free_throw_pct = np.divide(games[:, FREE_THROWS], games[:, FREE_THROW_ATTEMPTS], out=np.zeros(len(games)), where=games[:, FREE_THROW_ATTEMPTS] != 0)
+		return np.column_stack([games[:, POINTS], field_goal_pct, free_throw_pct, games[:, OFFENSIVE_REBOUNDS], games[:, DEFENSIVE_REBOUNDS], \
+			games[:, STEALS], games[:, ASSISTS], games[:, BLOCKS], games[:, TURNOVERS], games[:, PERSONAL_FOULS]])
 
+	@staticmethod
+	def roto_category_wins(games, other_games):
+		# 1 for a win, 0.5 for a tie and 0 for a loss in each category, so the other side's wins are just the complement
+		categories = GameData.roto_categories(games)
+		other_categories = GameData.roto_categories(other_games)
+		category_wins = (categories > other_categories) + (0.5 * (categories == other_categories))
+		return category_wins, 1 - category_wins
+
+	@staticmethod
+	def roto_score_batch(scoring_rules, games, other_games):
+		category_wins, _ = GameData.roto_category_wins(games, other_games)
+		return category_wins @ scoring_rules.roto_coefficient_vector()
+
+	@staticmethod
+	def valid_batch(scoring_rules, games):
+		scores = GameData.score_batch(scoring_rules, games)
+		return ~np.isnan(scores) & (scores >= 0) & (scores < 1000)
+
+	@staticmethod
+	def limit_game(game):
+		game.stats = game.get_stats() * 0.8
 		return game
 
 	@staticmethod
 	def out_game(game):
-		game.points = 0
-		game.rebounds = 0
-		game.assists = 0
-		game.steals = 0
-		game.blocks = 0
-		game.field_goals_attempts = 0
-		game.turnovers = 0
-		game.free_throw_attempts = 0
-		game.offensive_rebounds = 0
-		game.defensive_rebounds = 0
-		game.field_goals = 0
-		game.free_throws = 0
-		game.personal_fouls = 0
-
+		game.stats = np.zeros(len(STAT_COLUMNS))
 		return game
 
+class RunningMoments:
+
+	# Welford's update, one mean and sum of squared deviations per stat, so memory stays flat however many games are added
+	__slots__ = ("count", "mean", "m2")
+
+	def __init__(self, size):
+		self.count = 0
+		self.mean = np.zeros(size)
+		self.m2 = np.zeros(size)
+
+	def add(self, values):
+		self.count += 1
+		delta = values - self.mean
+		self.mean += delta / self.count
+		self.m2 += delta * (values - self.mean)
+
+	def add_batch(self, values):
+		# Chan et al.'s pairwise merge of the batch's moments into the running ones
+		count = len(values)
+		if count == 0:
+			return
+		batch_mean = values.mean(axis=0)
+		batch_m2 = ((values - batch_mean) ** 2).sum(axis=0)
+		total = self.count + count
+		delta = batch_mean - self.mean
+		self.m2 += batch_m2 + ((delta ** 2) * (self.count * count / total))
+		self.mean += delta * (count / total)
+		self.count = total
+
+	def set(self, count, mean, m2):
+		self.count = count
+		self.mean = np.array(mean, dtype=np.float64)
+		self.m2 = np.array(m2, dtype=np.float64)
+
+	def get_stdevs(self):
+		if self.count == 0:
+			return np.full(len(self.mean), np.nan)
+		return np.sqrt(self.m2 / self.count)
+
 class CumulativeGameData(GameData):
 
 	def __init__(self, scoring_rules=None, data=None):
 		super().__init__(scoring_rules, data)
 		self.num_games = 0
-		self.point_list = []
-		self.field_goal_list = []
-		self.field_goal_attempt_list = []
-		self.free_throw_list = []
-		self.free_throw_attempt_list = []
-		self.offensive_rebound_list = []
-		self.defensive_rebound_list = []
-		self.steal_list = []
-		self.assist_list = []
-		self.block_list = []
-		self.turnover_list = []
-		self.personal_foul_list = []
+		self.moments = RunningMoments(len(STAT_COLUMNS))
 
 	def add(self, other_game):
 		super().add(other_game)
-		self.point_list.append(other_game.get_points())
-		self.field_goal_list.append(other_game.get_field_goals())
-		self.field_goal_attempt_list.append(other_game.get_field_goal_attempts())
-		self.free_throw_list.append(other_game.get_free_throws())
-		self.free_throw_attempt_list.append(other_game.get_free_throw_attempts())
-		self.offensive_rebound_list.append(other_game.get_offensive_rebounds())
-		self.defensive_rebound_list.append(other_game.get_defensive_rebounds())
-		self.steal_list.append(other_game.get_steals())
-		self.assist_list.append(other_game.get_assists())
-		self.block_list.append(other_game.get_blocks())
-		self.turnover_list.append(other_game.get_turnovers())
-		self.personal_foul_list.append(other_game.get_personal_fouls())
+		self.moments.add(other_game.get_stats())
 		self.num_games += 1
 
+	def add_batch(self, games):
+		self.stats = self.stats + games.sum(axis=0)
+		self.moments.add_batch(games)
+		self.num_games += len(games)
+
+	@staticmethod
+	def from_moments(num_games, sums, m2, scoring_rules=None):
+		cumulative_game = CumulativeGameData(scoring_rules)
+		cumulative_game.stats = np.array(sums, dtype=np.float64)
+		cumulative_game.num_games = num_games
+		cumulative_game.moments.set(num_games, cumulative_game.stats / num_games if num_games else cumulative_game.stats, m2)
+		return cumulative_game
+
 	def get_stdevs(self):
+		stdevs = self.moments.get_stdevs()
 		return {
-			"points": np.std(self.point_list),
-			"offensive_rebounds": np.std(self.offensive_rebound_list),
-			"defensive_rebounds": np.std(self.defensive_rebound_list),
-			"steals": np.std(self.steal_list),
-			"assists": np.std(self.assist_list),
-			"blocks": np.std(self.block_list),
-			"turnovers": np.std(self.turnover_list),
-			"personal_fouls": np.std(self.personal_foul_list),
+			"points": stdevs[POINTS],
+			"offensive_rebounds": stdevs[OFFENSIVE_REBOUNDS],
+			"defensive_rebounds": stdevs[DEFENSIVE_REBOUNDS],
+			"steals": stdevs[STEALS],
+			"assists": stdevs[ASSISTS],
+			"blocks": stdevs[BLOCKS],
+			"turnovers": stdevs[TURNOVERS],
+			"personal_fouls": stdevs[PERSONAL_FOULS],
 		}
 
 	def get_num_games(self):
@@ -324,106 +633,71 @@ class CumulativeGameData(GameData):
 
 	def __str__(self):
 		if self.num_games == 0:
-			return "PTS: {} ORB: {} DRB: {} AST: {} BLK: {} STL: {} TO: {} FG%: {} FT%: {} PF: {}".format(self.points, self.offensive_rebounds, self.defensive_rebounds, \
-				self.assists, self.blocks, self.steals, self.turnovers, round(self.field_goals / self.field_goal_attempts, 2) if self.field_goal_attempts else 0, \
-				round(self.free_throws / self.free_throw_attempts, 2) if self.free_throw_attempts else 0, self.personal_fouls)
+			return super().__str__()
 
 		return "PTS: {} | TRB: {} | AST: {} | ORB: {} | DRB: {} | BLK: {} | STL: {} | TO: {} | FG%: {} | FT%: {} | PF: {}".format(
-			int(round(self.points / self.num_games, 0)),
-			int(round((self.offensive_rebounds + self.defensive_rebounds) / self.num_games, 0)),
-			int(round(self.assists / self.num_games, 0)), 
-			int(round(self.offensive_rebounds / self.num_games, 0)),
-			int(round(self.defensive_rebounds / self.num_games, 0)),
-			int(round(self.blocks / self.num_games, 0)),
-			int(round(self.steals / self.num_games, 0)),
-			int(round(self.turnovers / self.num_games, 0)),
-			int(round(100 * self.field_goals / self.field_goal_attempts, 0) if self.field_goal_attempts else 0),
-			int(round(100 * self.free_throws / self.free_throw_attempts, 0) if self.free_throw_attempts else 0),
-			int(round(self.personal_fouls / self.num_games, 0))
+			int(round(self.get_points() / self.num_games, 0)),
+			int(round(self.get_rebounds() / self.num_games, 0)),
+			int(round(self.get_assists() / self.num_games, 0)), 
+			int(round(self.get_offensive_rebounds() / self.num_games, 0)),
+			int(round(self.get_defensive_rebounds() / self.num_games, 0)),
+			int(round(self.get_blocks() / self.num_games, 0)),
+			int(round(self.get_steals() / self.num_games, 0)),
+			int(round(self.get_turnovers() / self.num_games, 0)),
+			int(round(100 * self.get_field_goals() / self.get_field_goal_attempts(), 0) if self.get_field_goal_attempts() else 0),
+			int(round(100 * self.get_free_throws() / self.get_free_throw_attempts(), 0) if self.get_free_throw_attempts() else 0),
+			int(round(self.get_personal_fouls() / self.num_games, 0))
 		)
 
 class RotoGameData:
 	def __init__(self, scoring_rules=None, data=None):
+		# running totals and category wins, ordered like ROTO_CATEGORIES
+		self.totals = np.zeros(len(ROTO_CATEGORIES))
+		self.win_totals = np.zeros(len(ROTO_CATEGORIES))
+		self.num_games = 0
 
-		self.points_win_rate = 0
-		self.assists_win_rate = 0
-		self.steals_win_rate = 0
-		self.blocks_win_rate = 0
-		self.turnovers_win_rate = 0
-		self.field_goal_pct_win_rate = 0
-		self.free_throw_pct_win_rate = 0
-		self.offensive_rebounds_win_rate = 0
-		self.defensive_rebounds_win_rate = 0
-		self.personal_fouls_win_rate = 0
-
-		self.points = 0
-		self.assists = 0
-		self.steals = 0
-		self.blocks = 0
-		self.turnovers = 0
-		self.field_goal_pct = 0
-		self.free_throw_pct = 0
-		self.offensive_rebounds = 0
-		self.defensive_rebounds = 0
-		self.personal_fouls = 0
+	def add(self, game, other, category_wins=None):
+		if category_wins is None:
+			category_wins, _ = GameData.roto_category_wins(game.get_stats(), other.get_stats())
+		self.add_batch(GameData.roto_categories(game.get_stats()), category_wins)
 
-		self.num_games = 0
+	def add_batch(self, categories, category_wins):
+		categories = np.atleast_2d(categories)
+		self.totals = self.totals + categories.sum(axis=0)
+		self.win_totals = self.win_totals + np.atleast_2d(category_wins).sum(axis=0)
+		self.num_games += len(categories)
 
-	def add(self, game, other):
-
-		def roto_value(first, second):
-			return 1 if first > second else (0 if second > first else 0.5)
-
-		self.points_win_rate += roto_value(game.get_points(), other.get_points())
-		self.assists_win_rate += roto_value(game.get_assists(), other.get_assists())
-		self.steals_win_rate += roto_value(game.get_steals(), other.get_steals())
-		self.turnovers_win_rate += roto_value(game.get_turnovers(), other.get_turnovers())
-		self.offensive_rebounds_win_rate += roto_value(game.get_offensive_rebounds(), other.get_offensive_rebounds())
-		self.defensive_rebounds_win_rate += roto_value(game.get_defensive_rebounds(), other.get_defensive_rebounds())
-		self.personal_fouls_win_rate += roto_value(game.get_personal_fouls(), other.get_personal_fouls())
-		self.blocks_win_rate += roto_value(game.get_blocks(), other.get_blocks())
-
-		game_field_goal_pct = game.get_field_goals() / game.get_field_goal_attempts() if game.get_field_goal_attempts() else 0
-		other_field_goal_pct = other.get_field_goals() / other.get_field_goal_attempts() if other.get_field_goal_attempts() else 0
-		self.field_goal_pct_win_rate += roto_value(game_field_goal_pct, other_field_goal_pct)
-
-		game_free_throw_pct = game.get_free_throws() / game.get_free_throw_attempts() if game.get_free_throw_attempts() else 0
-		other_free_throw_pct = other.get_free_throws() / other.get_free_throw_attempts() if other.get_free_throw_attempts() else 0
-		self.free_throw_pct_win_rate += roto_value(game_free_throw_pct, other_free_throw_pct)
-
-		self.points += game.get_points()
-		self.assists += game.get_assists()
-		self.steals += game.get_steals()
-		self.turnovers += game.get_turnovers()
-		self.offensive_rebounds += game.get_offensive_rebounds()
-		self.defensive_rebounds += game.get_defensive_rebounds()
-		self.personal_fouls += game.get_personal_fouls()
-		self.blocks += game.get_blocks()
-		self.field_goal_pct += game_field_goal_pct
-		self.free_throw_pct += game_free_throw_pct
+	def get_totals(self):
+		return self.totals
 
-		self.num_games += 1
+	def get_win_totals(self):
+		return self.win_totals
+
+	def get_num_games(self):
+		return self.num_games
 
 	def __str__(self):
+		averages = self.totals / self.num_games
+		win_rates = self.win_totals / self.num_games
 		return "PTS: {} ({}%) | AST: {} ({}%) | ORB: {} ({}%) | DRB: {} ({}%) | BLK: {} ({}%) | STL: {} ({}%) | TO: {} ({}%) | FG%: {} ({}%) | FT%: {} ({}%) | PF: {} ({}%)".format(
-			(int(self.points / self.num_games)),
-			(int(100 * self.points_win_rate / self.num_games)),
-			(int(self.assists / self.num_games)), 
-			(int(100 * self.assists_win_rate / self.num_games)),
-			(int(self.offensive_rebounds / self.num_games)),			
-			(int(100 * self.offensive_rebounds_win_rate / self.num_games)),
-			(int(self.defensive_rebounds / self.num_games)),
-			(int(100 * self.defensive_rebounds_win_rate / self.num_games)),
-			(int(self.blocks / self.num_games)),
-			(int(100 * self.blocks_win_rate / self.num_games)),
-			(int(self.steals / self.num_games)),
-			(int(100 * self.steals_win_rate / self.num_games)),
-			(int(self.turnovers / self.num_games)),
-			(int(100 * self.turnovers_win_rate / self.num_games)),
-			(round(self.field_goal_pct / self.num_games, 2)),
-			(int(100 * self.field_goal_pct_win_rate / self.num_games)),
-			(round(self.free_throw_pct / self.num_games, 2)),
-			(int(100 * self.free_throw_pct_win_rate / self.num_games)),
-			(int(self.personal_fouls / self.num_games)),
-			(int(100 * self.personal_fouls_win_rate / self.num_games))
+			(int(averages[ROTO_POINTS])),
+			(int(100 * win_rates[ROTO_POINTS])),
+			(int(averages[ROTO_ASSISTS])),
+			(int(100 * win_rates[ROTO_ASSISTS])),
+			(int(averages[ROTO_OFFENSIVE_REBOUNDS])),
+			(int(100 * win_rates[ROTO_OFFENSIVE_REBOUNDS])),
+			(int(averages[ROTO_DEFENSIVE_REBOUNDS])),
+			(int(100 * win_rates[ROTO_DEFENSIVE_REBOUNDS])),
+			(int(averages[ROTO_BLOCKS])),
+			(int(100 * win_rates[ROTO_BLOCKS])),
+			(int(averages[ROTO_STEALS])),
+			(int(100 * win_rates[ROTO_STEALS])),
+			(int(averages[ROTO_TURNOVERS])),
+			(int(100 * win_rates[ROTO_TURNOVERS])),
+			(round(averages[ROTO_FIELD_GOAL_PCT], 2)),
+			(int(100 * win_rates[ROTO_FIELD_GOAL_PCT])),
+			(round(averages[ROTO_FREE_THROW_PCT], 2)),
+			(int(100 * win_rates[ROTO_FREE_THROW_PCT])),
+			(int(averages[ROTO_PERSONAL_FOULS])),
+			(int(100 * win_rates[ROTO_PERSONAL_FOULS]))
 		)
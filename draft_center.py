@@ -1,6 +1,7 @@
 from player import PlayerGroup
 from participant import Participant
-import random, sys, copy
+import sys, copy
+import numpy as np
 
 class DraftCenter:
 
@@ -12,16 +13,20 @@ class DraftCenter:
 		self.aliases_to_player = {}
 		self.player_to_aliases = {}
 		self.roto = roto
+		self.generator = np.random.default_rng()
 
 	def set_roto_mode(self, roto):
 		self.roto = roto
 
+	def set_generator(self, generator):
+		self.generator = generator
+
 	def add_players(self, data, use_scouting_reports=False, number_of_games_of_scouting=0):
 
 		player_names = data.get_player_names()
 		names = copy.deepcopy(player_names)
-		random.shuffle(names)
-		self.order = PlayerGroup([(name, data.get_player_data(name), random.randint(3, 5)) for name in names], roto=self.roto)
+		self.generator.shuffle(names)
+		self.order = PlayerGroup([(name, data.get_player_data(name), int(self.generator.integers(3, 6))) for name in names], roto=self.roto)
 		self.players_added = True
 
 		current_alias = 0
@@ -29,7 +34,7 @@ class DraftCenter:
 			self.aliases_to_player[str(current_alias)] = name
 			self.player_to_aliases[name] = str(current_alias)
 			if use_scouting_reports:
-				if random.random() < 0.5:
+				if self.generator.random() < 0.5:
 					player = self.order.get_player_by_name(name)
 					player.generate_scouting_report(number_of_games_of_scouting)
 					player.set_alias(current_alias)
@@ -44,7 +49,7 @@ class DraftCenter:
 		lottery_teams = participants
 		if isinstance(reigning_champion, Participant) and isinstance(reigning_finalist, Participant):
 			lottery_teams = [participant for participant in filter(lambda x: x.get_name() not in [reigning_champion.get_name(), reigning_finalist.get_name()], participants)]
-		random.shuffle(lottery_teams)
+		self.generator.shuffle(lottery_teams)
 		last_years_results = [participant.get_wins_last_season() for participant in lottery_teams]
 		draft_order = [participant for _, participant in sorted(zip(last_years_results, lottery_teams), key=lambda pair: pair[0])]
 		if isinstance(reigning_champion, Participant) and isinstance(reigning_finalist, Participant):
@@ -7,7 +7,8 @@ from matchup_center import MatchupCenter
 from draft_center import DraftCenter
 from transaction_center import TransactionCenter, TransactionResult
 from scheduler import Scheduler, Event
-import json, random, copy, sys, re, time, operator
+import json, copy, sys, re, time, operator
+import numpy as np
 
 class League:
 
@@ -24,25 +25,44 @@ class League:
 		self.rules = None
 		self.all_auto = True
 
-	def load_from_config(self, config_path="./config.json"):
+	def load_from_config(self, config_path="./config.json", data=None, random_streams=None):
 		with open(config_path) as f:
 			json_obj = json.load(f)
 
-		self.rules = Rules(json_obj)
-		self.data = Database(json_obj["Data Path"], self.rules, json_obj["Positional Data Path"])
+		self.rules = Rules(json_obj, random_streams)
+		self.data = Database(json_obj["Data Path"], self.rules, json_obj["Positional Data Path"]) if data == None else data.bind_rules(self.rules)
 		self.draft_center.set_roto_mode(self.rules.is_roto())
+		self.draft_center.set_generator(self.rules.get_generator("draft"))
 
 		for participant in json_obj["Participants"]:
 			if participant["Autodraft"]:
 				participant_to_add = Agent(participant["Name"], self.rules, participant["Team Name"], participant["Autodraft"])
 				participant_to_add.set_mode(participant["Mode"])
+				participant_to_add.set_database(self.data)
 			else:
 				participant_to_add = Participant(participant["Name"], self.rules, participant["Team Name"], participant["Autodraft"])
 				self.all_auto = False
 			self.participants.append(participant_to_add)
 
+		self.set_headless(self.rules.is_headless())
+
+	def set_headless(self, headless):
+		if headless and not self.all_auto:
+			print("Warn: Headless mode needs every participant to be an agent, so it stays off")
+			headless = False
+		self.rules.set_headless(headless)
+
+	def is_headless(self):
+		return self.rules.is_headless()
+
+	def display(self, message="", *args):
+		# formatting happens here, so headless runs never build the strings
+		if not self.is_headless():
+			print(message.format(*args) if args else message)
+
 	def start_league(self):
-		self.rules.get_scoring_rules().display_weights()
+		if not self.is_headless() and not self.rules.play_by_play_mode():
+			self.rules.get_scoring_rules().display_weights()
 
 		draft_rules = self.rules.get_draft_rules()
 		self.draft_center.add_players(self.data, draft_rules.use_scouting(1), draft_rules.get_number_of_games_of_scouting(1))
@@ -53,10 +73,10 @@ class League:
 		number_of_rounds, snake, scouting, scouting_games = self.rules.get_draft_rules().get_properties_this_year(self.current_year)
 		draft_order, reverse_draft_order = self.draft_center.get_draft_order(self.participants, self.reigning_champion, self.reigning_finalist)
 
-		print("Draft Order")
+		self.display("Draft Order")
 		for i, participant in enumerate(draft_order):
-			print("{}. {}".format(i + 1, participant))
-		print()
+			self.display("{}. {}", i + 1, participant)
+		self.display()
 
 		self.accept_commands()
 
@@ -69,18 +89,19 @@ class League:
 			for participant in order_to_use:
 
 				if len(draft_group) == 0:
-					print("There are no players available to draft")
+					self.display("There are no players available to draft")
 					return
 
-				print("\n\nAvailable Players")
-				for player in draft_group:
-					print(player)
-				print()
+				if not self.is_headless():
+					print("\n\nAvailable Players")
+					for player in draft_group:
+						print(player)
+					print()
 
 				valid_selection = False
 				while not valid_selection:
 					drafter = Participant.get_participant_by_name(participant.get_drafter_name(year, current_round, one_index=False), self.participants)
-					print("{}'s turn to select:\n".format(drafter))
+					self.display("{}'s turn to select:\n", drafter)
 					selection = drafter.send_pick_to_commissioner(draft_group)
 
 					if selection == "pass":
@@ -94,7 +115,7 @@ class League:
 					else:
 						response = self.accept_commands(command=selection, display=False)
 						if response == TransactionResult.FAILURE:
-							print("{} is not a draftable player or a recognized command".format(selection))
+							self.display("{} is not a draftable player or a recognized command", selection)
 
 		self.free_agents = PlayerGroup([player for player in draft_group])
 
@@ -113,47 +134,57 @@ class League:
 			all_eligible = all_eligible and team_eligible
 		return all_eligible
 
+	def require_roster_eligibility(self):
+		eligible = self.check_roster_eligibility()
+		if self.is_headless():
+			self.require_headless_eligibility(eligible)
+			return
+		while not eligible:
+			print("Warn: One team does not meet roster rules")
+			self.accept_commands()
+			eligible = self.check_roster_eligibility()
+
+	def require_headless_eligibility(self, eligible):
+		# only agents play a headless league and check_roster_eligibility has just reset their lineups, so waiting would never help
+		if not eligible:
+			ineligible = [participant.get_name() for participant in self.participants if not participant.check_roster_eligibility()]
+			raise RuntimeError("{} could not set an eligible lineup in a headless league".format(", ".join(ineligible)))
+
 	def run_season(self, breakpoints=[]):
 
 		self.update_health_of_teams(guarantee_health=True)
 		self.accept_commands()
-		season_started = self.check_roster_eligibility()
-
-		while not season_started:
-			print("Warn: One team does not meet roster rules")
-			self.accept_commands()
-			season_started = self.check_roster_eligibility()
+		self.require_roster_eligibility()
 
-		for event_type, (contender_one, contender_two) in Scheduler.schedule(self.participants, 2):
+		segment = []
+		for event_type, matchup in Scheduler.schedule(self.participants, 2, self.rules.get_season_length()):
 			if event_type == Event.GAME:
-				if random.random() > 0.5:
-					winner, (contender_one_game, contender_two_game), (contender_one_score, contender_two_score) = MatchupCenter.play_game(contender_one, contender_two, False, self.rules.play_by_play_mode(), self.rules.is_roto())
-				else:
-					 winner, (contender_two_game, contender_one_game), (contender_two_score, contender_one_score) = MatchupCenter.play_game(contender_two, contender_one, False, self.rules.play_by_play_mode(), self.rules.is_roto())
-				contender_one.add_game(contender_one==winner, contender_one_score, game=contender_one_game, other=contender_two_game)
-				contender_two.add_game(contender_two==winner, contender_two_score, game=contender_two_game, other=contender_one_game)
-
-				if self.rules.play_by_play_mode():
-					contender_one.update_from_box_score(contender_one_game)
-					contender_two.update_from_box_score(contender_two_game)
+				segment.append(matchup)
 
 			elif event_type == Event.SEASON_BREAK:
+				self.play_segment(segment)
+				segment = []
 				self.get_rankings(display=True)
 				self.update_health_of_teams(guarantee_health=(False or not self.rules.get_team_rules().allow_injuries_mode()))
 				self.accept_commands()
 				acceptible_teams = self.check_roster_eligibility()
-				if not acceptible_teams:
+				if self.is_headless():
+					self.require_headless_eligibility(acceptible_teams)
+				elif not acceptible_teams:
 					print("Warn: One team does not meet roster rules")
 					self.accept_commands()
 					acceptible_teams = self.check_roster_eligibility()
 
-		print("The season is over")
+		self.play_segment(segment)
+
+		self.display("The season is over")
 		self.sleep(1)
-		print("This year's standings are...")
+		self.display("This year's standings are...")
 		self.sleep(3)
 		rankings = self.get_rankings(display=True)
 
-		if not self.rules.play_by_play_mode() and not self.rules.is_roto():
+		# awards are only ever displayed
+		if not self.rules.play_by_play_mode() and not self.rules.is_roto() and not self.is_headless():
 			self.sleep(3)
 			print("This year's MVP is...")
 			self.sleep(3)
@@ -163,38 +194,67 @@ class League:
 			print("The members of this year's First Team All-NBA are...")
 			all_stars = self.find_all_stars(5)
 			for (star, total_points) in all_stars:
-				print("{} ({})".format(star.get_name(), round(total_points / 82), 1))
+				print("{} ({})".format(star.get_name(), round(total_points / self.rules.get_season_length()), 1))
 			print()
 			self.sleep(3)
 
 
+	def play_segment(self, segment):
+		# the coin flip decides who is listed first, and so who wins ties
+		coin_flips = self.rules.get_generator("schedule").random(len(segment)) > 0.5
+		matchups = [(contender_one, contender_two) if coin_flip else (contender_two, contender_one) for (contender_one, contender_two), coin_flip in zip(segment, coin_flips)]
+
+		if self.rules.play_by_play_mode():
+			for contender_one, contender_two in matchups:
+				winner, (contender_one_game, contender_two_game) = MatchupCenter.play_by_play_game(contender_one, contender_two)
+				contender_one.add_game(contender_one==winner, contender_one_game.score())
+				contender_two.add_game(contender_two==winner, contender_two_game.score())
+				contender_one.update_from_box_score(contender_one_game)
+				contender_two.update_from_box_score(contender_two_game)
+			return
+
+		contender_one_wins, (contender_one_games, contender_two_games), (contender_one_scores, contender_two_scores), \
+			(contender_one_category_wins, contender_two_category_wins) = MatchupCenter.play_regular_segment(matchups, self.rules.is_roto())
+
+		# stack both sides so each participant's games can be pulled out in the order they were played
+		sides = np.array([[contender_one, contender_two] for contender_one, contender_two in matchups], dtype=object).T.ravel()
+		wins = np.concatenate([contender_one_wins, ~contender_one_wins])
+		scores = np.concatenate([contender_one_scores, contender_two_scores])
+		games = np.concatenate([contender_one_games, contender_two_games])
+		category_wins = np.concatenate([contender_one_category_wins, contender_two_category_wins]) if self.rules.is_roto() else None
+		game_numbers = np.tile(np.arange(len(matchups)), 2)
+
+		for participant in self.participants:
+			rows = np.flatnonzero(sides == participant)
+			rows = rows[np.argsort(game_numbers[rows], kind="stable")]
+			participant.add_games(wins[rows], scores[rows], games=games[rows], category_wins=category_wins[rows] if category_wins is not None else None)
+
 	def run_championship(self, dramatic=True):
 		rankings = self.get_rankings(display=False)
 		contender_one = rankings[0]
 		contender_two = rankings[1]
 
-		print("The finals matchup is...")
-		print("1. {} v 2. {}".format(contender_one, contender_two))
+		self.display("The finals matchup is...")
+		self.display("1. {} v 2. {}", contender_one, contender_two)
 		for participant in self.participants:
 			participant.start_championship()
 
 		self.update_health_of_teams(guarantee_health=True)
 		self.accept_commands()
-		
-		finals_started = self.check_roster_eligibility()
-		while not finals_started:
-			print("Warn: One team does not meet roster rules")
-			self.accept_commands()
-			finals_started = self.check_roster_eligibility()
+		self.require_roster_eligibility()
+
+		if not self.is_headless():
+			win_probability, (low, high), _ = MatchupCenter.estimate_matchup(contender_one, contender_two, play_by_play=self.rules.play_by_play_mode(), roto=self.rules.is_roto())
+			print("Projection: {} wins {}% of games ({}-{}%)\n".format(contender_one, int(round(100 * win_probability)), int(round(100 * low)), int(round(100 * high))))
 
 		contender_one_wins = 0
 		for game in range(7):
 			if dramatic:
 				self.sleep(2)
-			print(f"Finals Game {(game + 1)}")
-			winner, _, _ = MatchupCenter.play_game(contender_one, contender_two, display=True, play_by_play=self.rules.play_by_play_mode(), roto=self.rules.is_roto(), detailed_display=True)
+			self.display("Finals Game {}", game + 1)
+			winner = MatchupCenter.play_game(contender_one, contender_two, display=not self.is_headless(), play_by_play=self.rules.play_by_play_mode(), roto=self.rules.is_roto(), detailed_display=True)[0]
 			contender_one_wins = contender_one_wins + 1 if winner == contender_one else contender_one_wins
-			print("{} ({}) - {} ({})\n".format(contender_one, contender_one_wins, contender_two, (game + 1) - contender_one_wins))
+			self.display("{} ({}) - {} ({})\n", contender_one, contender_one_wins, contender_two, (game + 1) - contender_one_wins)
 			if contender_one_wins >= 4 or ((game + 1) - contender_one_wins) >= 4:
 				break
 
@@ -204,14 +264,14 @@ class League:
 		finalist.add_championship_lost()
 
 		self.sleep(1)
-		print("\n...And your champion is...")
+		self.display("\n...And your champion is...")
 		self.sleep(1)
-		print("{} in {} games!!!\n".format(champion.get_name().upper(), game + 1))
+		self.display("{} in {} games!!!\n", champion.get_name().upper(), game + 1)
 		self.sleep(2)
 		self.reigning_champion = champion
 		self.reigning_finalist = finalist
 
-		if not self.rules.play_by_play_mode() and not self.rules.is_roto():
+		if not self.rules.play_by_play_mode() and not self.rules.is_roto() and not self.is_headless():
 			print("This year's Finals MVP is...")
 			self.sleep(3)
 			mvp, mvp_score = champion.find_star()
@@ -279,7 +339,7 @@ class League:
 	def get_rankings(self, display=False):
 		rankings = sorted(self.participants, key=operator.methodcaller("get_ppg_this_season"), reverse=True)
 		rankings = sorted(rankings, key=operator.methodcaller("get_wins_this_season"), reverse=True)
-		if display:
+		if display and not self.is_headless():
 			print()
 			for i, participant in enumerate(rankings):
 				display_stat = f"{participant.get_ppg_this_season()}ppg"  if not self.rules.is_roto() else f"({participant.get_ppg_this_season()}ppg, {participant.get_roto_stats()})"
@@ -296,14 +356,14 @@ class League:
 			if star_score > mvp_score:
 				mvp = star_player
 				mvp_score = star_score
-		return mvp, round(mvp_score / 82, 1)
+		return mvp, round(mvp_score / self.rules.get_season_length(), 1)
 
 	def find_all_stars(self, num_all_stars):
 		all_player_stats = []
 		for participant in self.participants:
 			player_stats = participant.get_all_player_stats()
 			for player_pair in player_stats:
-				all_player_stats.append((player_pair[0], random.random(), player_pair[1]))
+				all_player_stats.append((player_pair[0], self.rules.get_generator("awards").random(), player_pair[1]))
 
 		sorted_results = list(reversed(sorted(all_player_stats)))
 		sorted_results_real = [(player, points) for (points, _, player) in sorted_results]
@@ -320,7 +380,7 @@ class League:
 				participant.update_health_status()
 
 	def sleep(self, length):
-		if self.rules.dramatic_mode():
+		if self.rules.dramatic_mode() and not self.is_headless():
 			time.sleep(length)
 
 	def save_agents(self):
@@ -1,5 +1,7 @@
-import random, sys
+import sys, itertools, bisect, math
+import numpy as np
 from player import Player
+from data import GameData, STAT_COLUMNS, ROTO_CATEGORIES
 
 class MatchupCenter:
 
@@ -15,8 +17,15 @@ class MatchupCenter:
 		contender_one_game = contender_one.play_game()
 		contender_two_game = contender_two.play_game()
 
-		contender_one_score = contender_one_game.score(other=contender_two_game, roto=roto)
-		contender_two_score = contender_two_game.score(other=contender_one_game, roto=roto)
+		if roto:
+			# one comparison covers both sides
+			roto_coefficients = contender_one.get_scoring_rules().roto_coefficient_vector()
+			contender_one_wins, contender_two_wins = GameData.roto_category_wins(contender_one_game.get_stats(), contender_two_game.get_stats())
+			contender_one_score = float(contender_one_wins[0] @ roto_coefficients)
+			contender_two_score = float(contender_two_wins[0] @ roto_coefficients)
+		else:
+			contender_one_score = contender_one_game.score()
+			contender_two_score = contender_two_game.score()
 
 		winner = contender_one if contender_one_score >= contender_two_score else contender_two
 		if display:
@@ -30,79 +39,114 @@ class MatchupCenter:
 
 
 	@staticmethod
-	def play_by_play_game(contender_one, contender_two, display=False, max_possessions=200):
+	def play_regular_segment(matchups, roto=False):
+		# lineups and injuries cannot change between season breaks, so every game in the segment is sampled and scored at once.
+		# contender one wins ties, as in play_regular_game
+		number_of_games = len(matchups)
+		games = np.zeros((2, number_of_games, len(STAT_COLUMNS)))
+		if number_of_games == 0:
+			empty_category_wins = (np.zeros((0, len(ROTO_CATEGORIES))), np.zeros((0, len(ROTO_CATEGORIES)))) if roto else (None, None)
+			return np.zeros(0, dtype=bool), (games[0], games[1]), (np.zeros(0), np.zeros(0)), empty_category_wins
+
+		appearances = {}
+		for game_number, matchup in enumerate(matchups):
+			for side, contender in enumerate(matchup):
+				appearances.setdefault(contender, []).append((side, game_number))
+
+		for contender, slots in appearances.items():
+			sides, game_numbers = np.array(slots).T
+			games[sides, game_numbers] = contender.play_games(len(slots))
+
+		scoring_rules = matchups[0][0].get_scoring_rules()
+		# the category wins are handed back too, so the caller can record them without comparing the games again
+		contender_one_category_wins, contender_two_category_wins = None, None
+		if roto:
+			contender_one_category_wins, contender_two_category_wins = GameData.roto_category_wins(games[0], games[1])
+			contender_one_scores = contender_one_category_wins @ scoring_rules.roto_coefficient_vector()
+			contender_two_scores = contender_two_category_wins @ scoring_rules.roto_coefficient_vector()
+		else:
+			contender_one_scores = GameData.score_batch(scoring_rules, games[0])
+			contender_two_scores = GameData.score_batch(scoring_rules, games[1])
 
-		def choose_assister(team, shooter):
-			other_players = list(filter(lambda x: x != shooter, [player for player in team.get_starters()]))
+		return contender_one_scores >= contender_two_scores, (games[0], games[1]), (contender_one_scores, contender_two_scores), \
+			(contender_one_category_wins, contender_two_category_wins)
 
-			prob_not_assisted = 1
-			for player in other_players:
-				prob_not_assisted *= (1 - player.get_stats().get_assist_percentage())
-			
-			if random.random() < prob_not_assisted:
-				return None
+	@staticmethod
+	def estimate_matchup(contender_one, contender_two, number_of_games=1000, play_by_play=False, roto=False):
+		# simulates games between the current lineups without recording them anywhere, using the same tie rules as play_game.
+		# draws come from their own stream so asking for a projection never changes how the league plays out
+		if number_of_games < 1:
+			raise ValueError("estimate_matchup needs at least one game to simulate, got {}".format(number_of_games))
+		generator = contender_one.get_generator("projections")
+		if play_by_play:
+			contender_one_wins, (contender_one_box_score, contender_two_box_score) = MatchupCenter.play_by_play_games(contender_one, contender_two, number_of_games, generator=generator)
+			contender_one_scores, contender_two_scores = contender_one_box_score.score(), contender_two_box_score.score()
+		else:
+			scoring_rules = contender_one.get_scoring_rules()
+			contender_one_games = contender_one.sample_games(number_of_games, generator)
+			contender_two_games = contender_two.sample_games(number_of_games, generator)
+			if roto:
+				contender_one_scores = GameData.roto_score_batch(scoring_rules, contender_one_games, contender_two_games)
+				contender_two_scores = GameData.roto_score_batch(scoring_rules, contender_two_games, contender_one_games)
 			else:
-				return random.choices(other_players, k=1, weights=[player.get_stats().get_assist_percentage() for player in other_players])[0]
-
-		def turnover(shooter):
-			return random.random() < shooter.get_stats().get_turnover_percentage()
+				contender_one_scores = GameData.score_batch(scoring_rules, contender_one_games)
+				contender_two_scores = GameData.score_batch(scoring_rules, contender_two_games)
+			contender_one_wins = contender_one_scores >= contender_two_scores
 
-		def shot(shooter, assisted, defensive_bpm):
-			three_pointer = random.random() < shooter.get_stats().get_three_point_attempt_rate()
-			success_rate = shooter.get_stats().get_three_point_percentage() if three_pointer else shooter.get_stats().get_two_point_percentage()
-			success_rate = success_rate + (0.025 if three_pointer else 0.05) if assisted else success_rate - (0.025 if three_pointer else 0.05)
-			return random.random() - defensive_bpm < success_rate, three_pointer
+		# Wilson score interval at 95%
+		win_probability = float(np.mean(contender_one_wins))
+		z = 1.96
+		center = (win_probability + (z ** 2 / (2 * number_of_games))) / (1 + (z ** 2 / number_of_games))
+		margin = (z / (1 + (z ** 2 / number_of_games))) * math.sqrt((win_probability * (1 - win_probability) / number_of_games) + (z ** 2 / (4 * number_of_games ** 2)))
 
-		def choose_shooter(team):
-			return random.choices(team.get_starters(), k=1, weights=[player.get_stats().get_usage_rate() for player in team.get_starters()])[0]
+		return win_probability, (center - margin, center + margin), (contender_one_scores, contender_two_scores)
 
-		def rebound(offensive_team, defensive_team):
-			team_offensive_rebound_pct = 1
-			for player in offensive_team.get_starters():
-				team_offensive_rebound_pct *= (1 - player.get_stats().get_offensive_rebound_percentage())
-			team_offensive_rebound_pct = 1 - team_offensive_rebound_pct
-
-			team_defensive_rebound_pct = 1
-			for player in defensive_team.get_starters():
-				team_defensive_rebound_pct *= (1 - player.get_stats().get_defensive_rebound_percentage())
-			team_defensive_rebound_pct = 1 - team_defensive_rebound_pct
-
-			team_offensive_rebound_pct /= (team_offensive_rebound_pct + team_defensive_rebound_pct)
-			offensive_rebound = random.random() < team_offensive_rebound_pct
-
-			if offensive_rebound:
-				rebounder = random.choices(offensive_team.get_starters(), k=1, weights=[player.get_stats().get_offensive_rebound_percentage() for player in offensive_team.get_starters()])[0]
-				return rebounder, True
-			else:
-				rebounder = random.choices(defensive_team.get_starters(), k=1, weights=[player.get_stats().get_defensive_rebound_percentage() for player in defensive_team.get_starters()])[0]
-				return rebounder, False
-
-		def possession(offensive_team, defensive_team, offensive_team_box_score, defensive_team_box_score):
-			shooter = choose_shooter(offensive_team)
-			if turnover(shooter):
-				return defensive_team
-			assister = choose_assister(offensive_team, shooter)
-			defense_effect = sum([player.get_stats().get_defensive_bpm() for player in defensive_team.get_starters()]) / len(defensive_team.get_starters())
-			success, three_pointer = shot(shooter, isinstance(assister, Player), defense_effect)
-			if not success:
-				rebounder, offensive_rebound = rebound(offensive_team, defensive_team)
-				offensive_team_box_score.add_rebound(rebounder) if offensive_rebound else defensive_team_box_score.add_rebound(rebounder)
-				return offensive_team if offensive_rebound else defensive_team
-			else:
-				offensive_team_box_score.add_points(shooter, 3 if three_pointer else 2)
-				offensive_team_box_score.add_assist(assister)
-				return defensive_team
+	@staticmethod
+	def play_by_play_game(contender_one, contender_two, display=False, max_possessions=200):
 
 		team_one = contender_one.get_team()
 		team_two = contender_two.get_team()
+		for player in itertools.chain(team_one.get_starters(), team_two.get_starters()):
+			player.get_stats().sample_profile()
+
 		team_one_box_score = BoxScore(team_one)
 		team_two_box_score = BoxScore(team_two)
-		offensive_team = team_one if random.random() < 0.5 else team_two
+		sides = [PossessionTables(team_one, team_one_box_score), PossessionTables(team_two, team_two_box_score)]
+		offensive_rebound_odds = [
+			sides[0].offensive_rebound_pct / (sides[0].offensive_rebound_pct + sides[1].defensive_rebound_pct),
+			sides[1].offensive_rebound_pct / (sides[1].offensive_rebound_pct + sides[0].defensive_rebound_pct)
+		]
+
+		# a possession consumes at most eight uniforms, so one bulk draw covers the whole game
+		draws = iter(contender_one.get_generator("play_by_play").random((max_possessions * 8) + 1).tolist())
+		offense = 0 if next(draws) < 0.5 else 1
 		for possession_count in range(max_possessions):
-			if offensive_team == team_one:
-				offensive_team = possession(team_one, team_two, team_one_box_score, team_two_box_score)
+			attack, defense = sides[offense], sides[1 - offense]
+
+			shooter = bisect.bisect(attack.usage_weights, next(draws) * attack.usage_weights[-1])
+			if next(draws) < attack.turnover_rates[shooter]:
+				offense = 1 - offense
+				continue
+
+			assister = None
+			if next(draws) >= attack.prob_not_assisted[shooter]:
+				assist_weights, assisters = attack.assist_weights[shooter]
+				assister = assisters[bisect.bisect(assist_weights, next(draws) * assist_weights[-1])]
+
+			three_pointer = next(draws) < attack.three_point_attempt_rates[shooter]
+			success_rate = attack.three_point_percentages[shooter] if three_pointer else attack.two_point_percentages[shooter]
+			success_rate += (0.025 if three_pointer else 0.05) if assister != None else -(0.025 if three_pointer else 0.05)
+
+			if next(draws) - defense.defense_effect < success_rate:
+				attack.box_score.add_points(attack.players[shooter], 3 if three_pointer else 2)
+				if assister != None:
+					attack.box_score.add_assist(attack.players[assister])
+				offense = 1 - offense
+			elif next(draws) < offensive_rebound_odds[offense]:
+				attack.box_score.add_rebound(attack.players[bisect.bisect(attack.offensive_rebound_weights, next(draws) * attack.offensive_rebound_weights[-1])])
 			else:
-				offensive_team = possession(team_two, team_one, team_two_box_score, team_one_box_score)
+				defense.box_score.add_rebound(defense.players[bisect.bisect(defense.defensive_rebound_weights, next(draws) * defense.defensive_rebound_weights[-1])])
+				offense = 1 - offense
 
 		winner = contender_one if team_one_box_score.score() > team_two_box_score.score() else contender_two
 		if display:
@@ -110,6 +154,118 @@ class MatchupCenter:
 
 		return winner, (team_one_box_score, team_two_box_score)
 
+	@staticmethod
+	def play_by_play_games(contender_one, contender_two, number_of_games, max_possessions=200, generator=None):
+		# the same possession rules as play_by_play_game, advanced for every game at once; each game draws its own season profiles
+		lineups = [[player for player in contender.get_team().get_starters()] for contender in [contender_one, contender_two]]
+		lineup_size = max([len(lineup) for lineup in lineups])
+		games = np.arange(number_of_games)
+
+		def table(field):
+			# (side, game, player) with empty lineup slots padded by zeros, which are never chosen and do not move the team rates
+			values = np.zeros((2, number_of_games, lineup_size))
+			for side, lineup in enumerate(lineups):
+				for i, profiles in enumerate(profiles_by_side[side]):
+					values[side, :, i] = profiles[field]
+			return values
+
+		def choose(cumulative_weights, draw):
+			choice = (cumulative_weights <= (draw * cumulative_weights[:, -1])[:, None]).sum(axis=1)
+			return np.minimum(choice, lineup_size - 1)
+
+		profiles_by_side = [[player.get_stats().sample_profiles(number_of_games, generator) for player in lineup] for lineup in lineups]
+		assist_percentages = table("assist_percentage")
+		offensive_rebound_percentages = table("offensive_rebound_percentage")
+		defensive_rebound_percentages = table("defensive_rebound_percentage")
+		prob_not_assisted = np.stack([np.prod(np.delete(1 - assist_percentages, shooter, axis=2), axis=2) for shooter in range(lineup_size)], axis=2)
+		offensive_rebound_pct = 1 - np.prod(1 - offensive_rebound_percentages, axis=2)
+		defensive_rebound_pct = 1 - np.prod(1 - defensive_rebound_percentages, axis=2)
+		offensive_rebound_odds = offensive_rebound_pct / (offensive_rebound_pct + defensive_rebound_pct[::-1])
+		defense_effect = np.stack([table("defensive_bpm")[side].sum(axis=1) / len(lineups[side]) for side in range(2)])
+
+		# tables are indexed by row = side * games + game for per-player weights, and by row * lineup size + player for per-player rates
+		rows = 2 * number_of_games
+		usage_weights = np.cumsum(table("usage_rate"), axis=2).reshape(rows, lineup_size)
+		offensive_rebound_weights = np.cumsum(offensive_rebound_percentages, axis=2).reshape(rows, lineup_size)
+		defensive_rebound_weights = np.cumsum(defensive_rebound_percentages, axis=2).reshape(rows, lineup_size)
+		assist_percentages = assist_percentages.reshape(rows, lineup_size)
+		turnover_rates = table("turnover_percentage").ravel()
+		three_point_attempt_rates = table("three_point_attempt_rate").ravel()
+		three_point_percentages = table("three_point_percentage").ravel()
+		two_point_percentages = table("two_point_percentage").ravel()
+		prob_not_assisted = prob_not_assisted.ravel()
+		offensive_rebound_odds = offensive_rebound_odds.ravel()
+		defense_effect = defense_effect.ravel()
+
+		points = np.zeros(rows * lineup_size, dtype=np.int64)
+		rebounds = np.zeros(rows * lineup_size, dtype=np.int64)
+		assists = np.zeros(rows * lineup_size, dtype=np.int64)
+
+		generator = generator if generator != None else contender_one.get_generator("play_by_play")
+		offense = (generator.random(number_of_games) >= 0.5).astype(np.int64)
+		for possession_count in range(max_possessions):
+			draws = generator.random((8, number_of_games))
+			attack = (offense * number_of_games) + games
+			defend = ((1 - offense) * number_of_games) + games
+
+			shooter = choose(usage_weights[attack], draws[0])
+			shot = (attack * lineup_size) + shooter
+			turnover = draws[1] < turnover_rates[shot]
+
+			assist_weights = assist_percentages[attack]
+			assist_weights.ravel()[(games * lineup_size) + shooter] = 0
+			assisted = ~turnover & (draws[2] >= prob_not_assisted[shot])
+			assister = choose(np.cumsum(assist_weights, axis=1), draws[3])
+
+			three_pointer = draws[4] < three_point_attempt_rates[shot]
+			bonus = np.where(three_pointer, 0.025, 0.05)
+			success_rate = np.where(three_pointer, three_point_percentages[shot], two_point_percentages[shot]) + np.where(assisted, bonus, -bonus)
+			made = ~turnover & (draws[5] - defense_effect[defend] < success_rate)
+
+			missed = ~turnover & ~made
+			offensive_rebound = missed & (draws[6] < offensive_rebound_odds[attack])
+			defensive_rebound = missed & ~offensive_rebound
+
+			# every index below names each game exactly once, so plain fancy-index adds cannot collide
+			points[shot] += np.where(made, np.where(three_pointer, 3, 2), 0)
+			assists[(attack * lineup_size) + assister] += made & assisted
+			rebounds[(attack * lineup_size) + choose(offensive_rebound_weights[attack], draws[7])] += offensive_rebound
+			rebounds[(defend * lineup_size) + choose(defensive_rebound_weights[defend], draws[7])] += defensive_rebound
+
+			offense = np.where(turnover | made | defensive_rebound, 1 - offense, offense)
+
+		points, rebounds, assists = [totals.reshape(2, number_of_games, lineup_size) for totals in [points, rebounds, assists]]
+		box_scores = [BatchBoxScore(lineups[side], points[side, :, :len(lineups[side])], rebounds[side, :, :len(lineups[side])], \
+			assists[side, :, :len(lineups[side])]) for side in range(2)]
+		return box_scores[0].score() > box_scores[1].score(), (box_scores[0], box_scores[1])
+
+class PossessionTables:
+
+	# everything a possession needs from one lineup, built once per game since lineups cannot change mid-game
+	def __init__(self, team, box_score):
+		self.players = [player for player in team.get_starters()]
+		self.box_score = box_score
+		profiles = [player.get_stats().get_profile() for player in self.players]
+
+		self.usage_weights = list(itertools.accumulate([profile.usage_rate for profile in profiles]))
+		self.turnover_rates = [profile.turnover_percentage for profile in profiles]
+		self.three_point_attempt_rates = [profile.three_point_attempt_rate for profile in profiles]
+		self.three_point_percentages = [profile.three_point_percentage for profile in profiles]
+		self.two_point_percentages = [profile.two_point_percentage for profile in profiles]
+
+		self.prob_not_assisted = []
+		self.assist_weights = []
+		for shooter in range(len(profiles)):
+			assisters = [i for i in range(len(profiles)) if i != shooter]
+			self.prob_not_assisted.append(math.prod([1 - profiles[i].assist_percentage for i in assisters]))
+			self.assist_weights.append((list(itertools.accumulate([profiles[i].assist_percentage for i in assisters])), assisters))
+
+		self.offensive_rebound_weights = list(itertools.accumulate([profile.offensive_rebound_percentage for profile in profiles]))
+		self.defensive_rebound_weights = list(itertools.accumulate([profile.defensive_rebound_percentage for profile in profiles]))
+		self.offensive_rebound_pct = 1 - math.prod([1 - profile.offensive_rebound_percentage for profile in profiles])
+		self.defensive_rebound_pct = 1 - math.prod([1 - profile.defensive_rebound_percentage for profile in profiles])
+		self.defense_effect = sum([profile.defensive_bpm for profile in profiles]) / len(profiles)
+
 class BoxScore:
 
 	def __init__(self, team):
@@ -152,3 +308,33 @@ class BoxScore:
 
 
 
+
+class BatchBoxScore:
+
+	def __init__(self, players, points, rebounds, assists):
+		self.names = [player.get_name() for player in players]
+		self.points = points
+		self.rebounds = rebounds
+		self.assists = assists
+
+	def __len__(self):
+		return len(self.points)
+
+	def score(self):
+		return self.points.sum(axis=1)
+
+	def get_points(self):
+		return self.points
+
+	def get_rebounds(self):
+		return self.rebounds
+
+	def get_assists(self):
+		return self.assists
+
+	def get_box_score(self, game):
+		box_score = BoxScore.__new__(BoxScore)
+		box_score.stats = {name: {"Points": int(self.points[game, i]), "Rebounds": int(self.rebounds[game, i]), "Assists": int(self.assists[game, i])} \
+			for i, name in enumerate(self.names)}
+		box_score.team_points = int(self.points[game].sum())
+		return box_score
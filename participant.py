@@ -1,8 +1,9 @@
 from team import Team
 from player import Player
 from draft_picks import DraftPickStore
-from data import RotoGameData
-import re, sys, random
+from data import GameData, RotoGameData
+import re, sys
+import numpy as np
 
 class Participant:
 
@@ -49,20 +50,32 @@ class Participant:
 		self.team.restore_to_health()
 
 	def update_health_status(self):
-		self.team.update_health_status()
+		self.team.update_health_status(self.rules.get_generator("injuries"))
 
 	def find_star(self):
-		return self.team.find_star()
+		return self.team.find_star(self.rules.get_generator("awards"))
 
 	def play_game(self):
 		game = self.team.play_game()
 		game.set_scoring_rules(self.rules.get_scoring_rules())
 		return game
 
+	def sample_games(self, number_of_games, generator=None):
+		return self.team.sample_games(number_of_games, generator)
+
+	def play_games(self, number_of_games):
+		return self.team.play_games(number_of_games)
+
+	def get_scoring_rules(self):
+		return self.rules.get_scoring_rules()
+
+	def get_generator(self, name):
+		return self.rules.get_generator(name)
+
 	def start_championship(self):
 		self.team.start_championship()	
 
-	def add_game(self, win, points, game=None, other=None):
+	def add_game(self, win, points, game=None, other=None, category_wins=None):
 		self.points_this_year += points
 		if win:
 			self.wins_this_season += 1
@@ -70,8 +83,17 @@ class Participant:
 			self.losses_this_season += 1
 
 		if self.rules.is_roto() and game and other:
-			self.roto_stats.add(game=game, other=other)
+			self.roto_stats.add(game=game, other=other, category_wins=category_wins)
 		
+	def add_games(self, wins, points, games=None, category_wins=None):
+		# wins and points are in the order the games were played, so the running point total sums the same way add_game would
+		self.points_this_year = sum(points.tolist(), self.points_this_year)
+		self.wins_this_season += int(np.count_nonzero(wins))
+		self.losses_this_season += len(wins) - int(np.count_nonzero(wins))
+
+		if self.rules.is_roto() and games is not None and len(games) > 0:
+			self.roto_stats.add_batch(GameData.roto_categories(games), category_wins)
+
 	def get_roto_stats(self):
 		return self.roto_stats
 
@@ -81,7 +103,7 @@ class Participant:
 	def end_season(self, ranking):
 		self.team.age()
 		self.points_results.append(self.points_this_year)
-		self.wins_last_season = self.wins_this_season + (self.points_this_year / 1000) + (random.random() / 100000) # for tiebreaking
+		self.wins_last_season = self.wins_this_season + (self.points_this_year / 1000) + (self.rules.get_generator("tiebreaks").random() / 100000) # for tiebreaking
 		self.losses_last_season = self.losses_this_season
 		self.wins_this_season = 0
 		self.losses_this_season = 0
@@ -194,7 +216,7 @@ class Participant:
 		self.draft_picks.transfer_pick(pick, recipient, suppress_check=suppress_check)
 
 	def get_all_player_stats(self):
-		return self.team.get_all_player_stats()
+		return self.team.get_all_player_stats(self.rules.get_generator("awards"))
 
 	def is_a_person(self):
 		return True
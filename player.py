@@ -1,6 +1,7 @@
 from data import PlayerData, GameData, CumulativeGameData
 from enum import Enum, auto
-import sys, math, random, re
+import sys, re
+import numpy as np
 
 class Player:
 
@@ -60,8 +61,6 @@ class Player:
 			print("Error: No games to sample from. Action denied")
 			return
 		game = self.data.sample_game()
-		while math.isnan(game.score()):
-			game = self.data.sample_game()
 
 		if self.injury_status == InjuryStatus.LIMITED:
 			game = GameData.limit_game(game)
@@ -83,19 +82,43 @@ class Player:
 
 		return game
 
+	def sample_games(self, number_of_games, generator=None):
+		games = self.data.sample_games(number_of_games, generator=generator)
+		if self.injury_status == InjuryStatus.LIMITED:
+			games = games * 0.8
+		elif self.injury_status == InjuryStatus.OUT:
+			games = np.zeros_like(games)
+		return games
+
+	def play_games(self, number_of_games):
+		# same bookkeeping as number_of_games calls to sample_game(real_game=True)
+		games = self.sample_games(number_of_games)
+		self.cumulative_game.add_batch(games)
+		self.cumulative_game_this_year.add_batch(games)
+
+		if not self.roto:
+			scores = GameData.score_batch(self.data.get_scoring_rules(), games).tolist()
+			self.total_points = sum(scores, self.total_points)
+			self.points_this_year = sum(scores, self.points_this_year)
+
+		self.games_started += number_of_games
+		self.games_started_this_year += number_of_games
+		self.use_scouting = False
+
+		return games
+
 	def generate_scouting_report(self, number_of_games):
 		self.use_scouting = True
-		number_of_games_to_use = random.randrange(1, number_of_games)
-		games = [self.sample_game(real_game=False) for i in range(number_of_games_to_use)]
+		number_of_games_to_use = int(self.data.get_generator().integers(1, number_of_games))
+		games = self.sample_games(number_of_games_to_use)
 
 		if self.roto:
 			total_game = CumulativeGameData()
-			for game in games:
-				total_game.add(game)
+			total_game.add_batch(games)
 			self.scouting_report = "Value: {}, Games: {}".format(str(total_game), number_of_games_to_use)
 			self.scout_value = (total_game, number_of_games_to_use)
 		else:
-			avg_score = round(sum([game.score() for game in games]) / number_of_games_to_use, 0)
+			avg_score = round(float(np.mean(GameData.score_batch(self.data.get_scoring_rules(), games))), 0)
 			self.scouting_report = "Value: {}, Games: {}".format(str(avg_score), number_of_games_to_use)
 			self.scout_value = (avg_score, number_of_games_to_use)
 
@@ -136,8 +159,8 @@ class Player:
 		positions = ["PG", "SG", "SF", "PF", "C"]
 		return positions[self.get_position() - 1]
 
-	def recalculate_injury_status(self):
-		rand = random.random()
+	def recalculate_injury_status(self, generator):
+		rand = generator.random()
 		if rand < 0.03:
 			self.injury_status = InjuryStatus.OUT
 		elif rand < 0.06:
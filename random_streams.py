@@ -0,0 +1,27 @@
+import numpy as np
+
+# every subsystem draws from its own stream, so an extra injury roll or draft shuffle never shifts the games that get sampled
+STREAM_NAMES = ["scoring", "sampling", "injuries", "draft", "schedule", "play_by_play", "tiebreaks", "awards", "projections"]
+
+class RandomStreams:
+
+	def __init__(self, seed=None, spawn_key=()):
+		self.seed_sequence = np.random.SeedSequence(seed, spawn_key=tuple(spawn_key))
+		children = self.seed_sequence.spawn(len(STREAM_NAMES))
+		self.generators = {name: np.random.Generator(np.random.PCG64(child)) for name, child in zip(STREAM_NAMES, children)}
+
+	def get(self, name):
+		if name not in self.generators:
+			print("Error: No random stream named {}".format(name))
+			return None
+		return self.generators[name]
+
+	def get_seed(self):
+		return self.seed_sequence.entropy
+
+	def get_spawn_key(self):
+		return self.seed_sequence.spawn_key
+
+	def for_worker(self, worker):
+		# keyed on the worker number rather than spawned, so worker n gets the same streams however the work is split up
+		return RandomStreams(self.get_seed(), self.get_spawn_key() + (len(STREAM_NAMES) + worker,))
@@ -1,22 +1,27 @@
-import json, random, sys
+from random_streams import RandomStreams
+import json, sys
+import numpy as np
 
 class Rules:
 
-	def __init__(self, config):
+	def __init__(self, config, random_streams=None):
+		self.random_streams = random_streams if random_streams != None else RandomStreams(config.get("Seed"))
 		self.play_by_play = config["Play-by-play"]
 		self.discord_mode = config["Discord Mode"]
 		self.dramatic = config["Dramatic"] and not self.discord_mode
+		self.headless = config.get("Headless", False)
 		self.team_rules = TeamRules(config["Lineup Size"], config["Roster Size"], config["Positional Constraints"], config["Allow Injuries"])
 		self.draft_rules = DraftRules(config["Draft Rules"])
 		self.roto_mode = config["Roto"]
 		self.training = config["Training"]
+		self.season_length = config.get("Season Length", 82)
 
 		self.scoring_rules = None
 		if not config["Play-by-play"]:
 			if self.roto_mode:
-				self.scoring_rules = ScoringRules(config["Scoring Rules"]["Roto"])
+				self.scoring_rules = ScoringRules(config["Scoring Rules"]["Roto"], self.random_streams.get("scoring"))
 			else:
-				self.scoring_rules = ScoringRules(config["Scoring Rules"]["Standard"])
+				self.scoring_rules = ScoringRules(config["Scoring Rules"]["Standard"], self.random_streams.get("scoring"))
 
 	def play_by_play_mode(self):
 		return self.play_by_play
@@ -24,6 +29,12 @@ class Rules:
 	def dramatic_mode(self):
 		return self.dramatic
 
+	def is_headless(self):
+		return self.headless
+
+	def set_headless(self, headless):
+		self.headless = headless
+
 	def get_team_rules(self):
 		return self.team_rules
 
@@ -42,6 +53,15 @@ class Rules:
 	def is_training(self):
 		return self.training
 
+	def get_season_length(self):
+		return self.season_length
+
+	def get_random_streams(self):
+		return self.random_streams
+
+	def get_generator(self, name):
+		return self.random_streams.get(name)
+
 class TeamRules:
 
 	def __init__(self, starting_lineup_size, roster_size, positionally_constrained, allow_injuries):
@@ -91,8 +111,9 @@ class DraftRules:
 
 class ScoringRules:
 
-	def __init__(self, scoring_rules):
+	def __init__(self, scoring_rules, generator=None):
 
+		self.generator = generator if generator != None else np.random.default_rng()
 		self.randomize = scoring_rules["Randomization"]["Enable"]
 		self.distribution = scoring_rules["Randomization"]["Distribution"] if self.randomize else None
 		self.standard_deviation = scoring_rules["Randomization"]["Standard Deviation"] if self.distribution == "normal" else None
@@ -112,6 +133,12 @@ class ScoringRules:
 		self.turnovers = self.random_transform(scoring_rules["Turnovers"])
 		self.personal_fouls = self.random_transform(scoring_rules["Personal Fouls"])
 
+		# ordered like data.STAT_COLUMNS and the roto categories in data.GameData.roto_categories
+		self.coefficients = np.array([self.points, self.field_goals, self.field_goal_attempts, self.free_throws, self.free_throw_attempts, \
+			self.offensive_rebounds, self.defensive_rebounds, self.steals, self.assists, self.blocks, self.turnovers, self.personal_fouls], dtype=np.float64)
+		self.roto_coefficients = np.array([self.points, self.field_goals, self.free_throws, self.offensive_rebounds, self.defensive_rebounds, \
+			self.steals, self.assists, self.blocks, self.turnovers, self.personal_fouls], dtype=np.float64)
+
 	def random_transform(self, original_number):
 		if not original_number:
 			original_number = 0
@@ -120,9 +147,9 @@ class ScoringRules:
 			return original_number
 
 		if self.distribution == "normal":
-			transformed = random.gauss(original_number, self.standard_deviation)
+			transformed = self.generator.normal(original_number, self.standard_deviation)
 		else:
-			transformed = (random.random() * (2 * self.bounds)) + original_number
+			transformed = (self.generator.random() * (2 * self.bounds)) + original_number
 		
 		if not self.flip_parity:
 			return transformed
@@ -167,6 +194,12 @@ class ScoringRules:
 	def personal_fouls_coeff(self):
 		return self.personal_fouls
 
+	def coefficient_vector(self):
+		return self.coefficients
+
+	def roto_coefficient_vector(self):
+		return self.roto_coefficients
+
 	def display_weights(self):
 		print()
 		print("Points:", round(self.points, 2))
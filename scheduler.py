@@ -1,57 +1,98 @@
 from enum import Enum, auto
+from functools import lru_cache
+import heapq
 
 class Event(Enum):
 	GAME = auto()
 	SEASON_BREAK = auto()
 
+class LazyPlan:
+
+	def __init__(self, events):
+		self.events = events
+		self.played = []
+
+	def __iter__(self):
+		# events are pulled from the generator only as far as some season has got, and replayed from the list after that
+		i = 0
+		while True:
+			if i == len(self.played):
+				event = next(self.events, None)
+				if event == None:
+					return
+				self.played.append(event)
+			yield self.played[i]
+			i += 1
+
 class Scheduler:
 
 	@staticmethod
-	def schedule(participants, number_of_breaks):
-		max_games = 82
-		num_cycles = int(max_games / (len(participants) - 1))
-
-		games_played_per_participant = {}
-		for participant in participants:
-			games_played_per_participant[participant] = 0
-
-		break_points = [int(max_games * (break_num / (number_of_breaks + 1))) for break_num in range(1, number_of_breaks + 1)]
-		expected_breaks = []
-		for i in range(max_games):
-			if i in break_points:
-				expected_breaks.append(expected_breaks[-1] + 1 if i > 0 else 1)
+	def schedule(participants, number_of_breaks, season_length=82):
+		# the plan is memoized per league shape and only holds indices, so the matchups themselves are produced as they are played
+		for event_type, first, second in Scheduler.plan(len(participants), number_of_breaks, season_length):
+			if event_type == Event.GAME:
+				yield event_type, (participants[first], participants[second])
 			else:
-				expected_breaks.append(expected_breaks[-1] if i > 0 else 0)
+				yield event_type, (None, None)
 
-		breaks_so_far = 0
-		matchups = []
-		for cycle in range(num_cycles):
-			for i, contender_one in enumerate(participants):
-				for contender_two in participants[i + 1:]:
-					matchups.append((Event.GAME, (contender_one, contender_two)))
-					games_played_per_participant[contender_one] += 1
-					games_played_per_participant[contender_two] += 1
-
-			games_played = games_played_per_participant[participants[0]] # all teams will have played the same number of games here so key doesn't matter
-			if games_played < len(expected_breaks) and breaks_so_far < expected_breaks[games_played]:
-				matchups.append((Event.SEASON_BREAK, (None, None)))
-				breaks_so_far += 1
+	@staticmethod
+	@lru_cache(maxsize=32)
+	def plan(number_of_participants, number_of_breaks, season_length=82):
+		return LazyPlan(Scheduler.generate_plan(number_of_participants, number_of_breaks, season_length))
 
-		least_played_pairs = sorted([(games_played_per_participant[participant], participant) for participant in participants], key=lambda x: x[0])
-		least_played_games = [games for games, _  in least_played_pairs]
+	@staticmethod
+	def generate_plan(number_of_participants, number_of_breaks, season_length=82):
+		if number_of_participants < 2:
+			return
+
+		# every game adds one to two totals, so an odd field cannot all finish on an odd length and each team plays one extra game
+		if number_of_participants % 2 == 1 and season_length % 2 == 1:
+			print("Warn: {} teams cannot all play {} games, so every team will play {}".format(number_of_participants, season_length, season_length + 1))
 
-		while min(least_played_games) != max(least_played_games) or min(least_played_games) < max_games:
+		break_points = [int(season_length * (break_num / (number_of_breaks + 1))) for break_num in range(1, number_of_breaks + 1)]
+		games_played = [0] * number_of_participants
+		breaks_so_far = 0
 
-			matchups.append((Event.GAME, (least_played_pairs[0][1], least_played_pairs[1][1])))
-			games_played_per_participant[least_played_pairs[0][1]] += 1
-			games_played_per_participant[least_played_pairs[1][1]] += 1
+		def break_due(fewest_games):
+			return breaks_so_far < len(break_points) and fewest_games >= break_points[breaks_so_far]
 
-			least_played_pairs = sorted([(games_played_per_participant[participant], participant) for participant in participants], key=lambda x: x[0])
-			least_played_games = [games for games, _  in least_played_pairs]
+		# circle method: one participant stays put while the rest rotate, so every round pairs everyone (an odd field gets a bye)
+		# and every pair meets once per cycle of rounds
+		field = list(range(number_of_participants)) + ([None] if number_of_participants % 2 else [])
+		rotating = field[1:]
+		round_number = 0
+		while True:
+			offset = round_number % len(rotating)
+			arrangement = [field[0]] + rotating[offset:] + rotating[:offset]
+			pairs = [(arrangement[i], arrangement[-1 - i]) for i in range(len(arrangement) // 2)]
+			pairs = [(min(pair), max(pair)) for pair in pairs if None not in pair]
+			if any(games_played[first] >= season_length or games_played[second] >= season_length for first, second in pairs):
+				break
 
-			if min(least_played_games) == max(least_played_games) and breaks_so_far < expected_breaks[games_played]:
-				matchups.append((Event.SEASON_BREAK, (None, None)))
+			for first, second in pairs:
+				yield Event.GAME, first, second
+				games_played[first] += 1
+				games_played[second] += 1
+			round_number += 1
+
+			if break_due(min(games_played)):
+				yield Event.SEASON_BREAK, None, None
 				breaks_so_far += 1
 
-		return matchups
+		# whatever the rounds could not cover is evened out by repeatedly pairing the two participants with the fewest games
+		most_played = max(games_played)
+		heap = [(games, participant) for participant, games in enumerate(games_played)]
+		heapq.heapify(heap)
+		while heap[0][0] != most_played or heap[0][0] < season_length:
+			first_games, first = heapq.heappop(heap)
+			second_games, second = heapq.heappop(heap)
+			yield Event.GAME, min(first, second), max(first, second)
+			games_played[first] += 1
+			games_played[second] += 1
+			heapq.heappush(heap, (first_games + 1, first))
+			heapq.heappush(heap, (second_games + 1, second))
+			most_played = max(most_played, first_games + 1, second_games + 1)
 
+			if break_due(heap[0][0]):
+				yield Event.SEASON_BREAK, None, None
+				breaks_so_far += 1
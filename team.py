@@ -1,6 +1,7 @@
 from player import Player, PlayerGroup
-from data import GameData, RotoGameData
-import sys, random
+from data import GameData, RotoGameData, STAT_COLUMNS
+import sys
+import numpy as np
 
 class Team:
 
@@ -33,16 +34,16 @@ class Team:
 		for player in self.all_players:
 			player.restore_to_health()
 
-	def update_health_status(self):
+	def update_health_status(self, generator):
 		for player in self.all_players:
-			player.recalculate_injury_status()
+			player.recalculate_injury_status(generator)
 
-	def find_star(self):
-		star = self.get_all_player_stats()[0][1]
+	def find_star(self, generator):
+		star = self.get_all_player_stats(generator)[0][1]
 		return star, star.get_points_this_year()
 
-	def get_all_player_stats(self):
-		player_stats =  list(reversed(sorted([(player.get_points_this_year(), random.random(), player) for player in self.all_players])))
+	def get_all_player_stats(self, generator):
+		player_stats =  list(reversed(sorted([(player.get_points_this_year(), generator.random(), player) for player in self.all_players])))
 		return [(points, player) for (points, _, player) in player_stats]
 
 	def start_championship(self):
@@ -71,6 +72,18 @@ class Team:
 			game.add(player.sample_game())
 		return game
 
+	def sample_games(self, number_of_games, generator=None):
+		games = np.zeros((number_of_games, len(STAT_COLUMNS)))
+		for player in self.starting_players:
+			games += player.sample_games(number_of_games, generator)
+		return games
+
+	def play_games(self, number_of_games):
+		games = np.zeros((number_of_games, len(STAT_COLUMNS)))
+		for player in self.starting_players:
+			games += player.play_games(number_of_games)
+		return games
+
 	def age(self):
 		players_to_remove = []
 		for player in self.all_players:
@@ -0,0 +1,100 @@
+import os, sys, json, math, shutil, tempfile, unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from agent_model import AgentModel, NUM_FEATURES
+from data import Database
+from rules import Rules
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "config.json")
+PLAYERS = {"Michael Jordan": 2, "Larry Bird": 2, "Magic Johnson": 2, "Kevin McHale": 2, "Bill Russell": 3}
+
+def logpdf(value, mean, std):
+	return -0.5 * ((value - mean) / std) ** 2 - math.log(std) - 0.5 * math.log(2 * math.pi)
+
+class TestAgentModel(unittest.TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		generator = np.random.default_rng(0)
+		data_path = os.path.join(self.directory, "games.csv")
+		with open(data_path, "w") as f:
+			f.write("NAME,FG,FGA,FT,FTA,ORB,DRB,AST,STL,BLK,TOV,PF,PTS\n")
+			for name in PLAYERS:
+				for _ in range(15):
+					fg, ft = generator.integers(2, 12), generator.integers(0, 8)
+					f.write("{},{},{},{},{},{}\n".format(name, fg, fg + generator.integers(0, 10), ft, ft + generator.integers(0, 3), \
+						",".join(str(stat) for stat in generator.integers(0, 8, size=7)) + ",{}".format(2 * fg + ft)))
+		positions_path = os.path.join(self.directory, "positions.csv")
+		with open(positions_path, "w") as f:
+			f.write("Name,Proper\n" + "".join("{},{}\n".format(name, position) for name, position in PLAYERS.items()))
+		with open(CONFIG_PATH) as f:
+			config = json.load(f)
+		config["Seed"] = 0
+		self.data = Database(data_path, Rules(config), positions_path, cache_directory=None)
+
+		self.names = list(PLAYERS.keys())
+		self.dataset = generator.uniform(1, 20, size=(len(self.names), NUM_FEATURES))
+		self.stds = {name: generator.uniform(0.5, 5, size=NUM_FEATURES) for name in self.names}
+		self.predicted_scores = {name: float(generator.uniform(10, 50)) for name in self.names}
+		self.model = AgentModel(self.predicted_scores, self.data, self.dataset, self.stds, self.names, {name: i for i, name in enumerate(self.names)})
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	# the per-player normal densities get_odds summed before the posterior was vectorized
+	def original_odds(self, position, game_count, sample):
+		sample_array = self.model.cumulative_game_data_to_array(sample)
+		scale = math.sqrt(game_count)
+		odds = {}
+		for name in filter(lambda x: PLAYERS[x] == position, self.names):
+			means, stds = self.dataset[self.names.index(name)], self.stds[name]
+			odds[name] = math.exp(logpdf(sample_array[0], means[0], stds[0] / scale) + \
+				logpdf(sample_array[3] + sample_array[4], means[3] + means[4], math.sqrt(stds[3] ** 2 + stds[4] ** 2) / scale) + \
+				logpdf(sample_array[5], means[5], stds[5] / scale) + logpdf(sample_array[6], means[6], stds[6] / scale) + logpdf(sample_array[7], means[7], stds[7] / scale))
+		total = sum(odds.values())
+		return {name: value / total for name, value in odds.items()}
+
+	def samples(self):
+		for name in self.names:
+			for game_count in [1, 4, 8]:
+				yield name, game_count, self.data.get_player_data(name).sample_games(game_count, cumulative=True)
+
+	def test_odds_match_original_formula(self):
+		for name, game_count, sample in self.samples():
+			expected = self.original_odds(PLAYERS[name], game_count, sample)
+			odds = self.model.get_odds(name, game_count, sample=sample)
+			self.assertEqual(set(odds.keys()), set(expected.keys()))
+			for candidate in expected:
+				self.assertAlmostEqual(odds[candidate], expected[candidate], places=12)
+
+	def test_score_many_matches_original_score(self):
+		board = [(None, PLAYERS[name], game_count, sample) for name, game_count, sample in self.samples()] + [(name, None, None, None) for name in self.names]
+		expected = [sum(odds * self.predicted_scores[candidate] for candidate, odds in self.original_odds(position, game_count, sample).items()) \
+			for _, position, game_count, sample in board[:-len(self.names)]] + [self.predicted_scores[name] for name in self.names]
+		self.assertTrue(np.allclose(self.model.score_many(board), expected, rtol=1e-12))
+		self.assertEqual([self.model.score(*player) for player in board], self.model.score_many(board))
+
+	def test_std_floor_is_opt_in(self):
+		self.stds["Larry Bird"] = np.zeros(NUM_FEATURES)
+		unfloored = AgentModel(self.predicted_scores, self.data, self.dataset, self.stds, self.names, {name: i for i, name in enumerate(self.names)})
+		floored = AgentModel(self.predicted_scores, self.data, self.dataset, self.stds, self.names, {name: i for i, name in enumerate(self.names)}, min_std=0.1)
+		self.assertTrue(np.all(unfloored.get_likelihood_arrays(2)[2][1] == 0))
+		self.assertTrue(np.all(floored.get_likelihood_arrays(2)[2][1] == 0.1))
+
+		_, game_count, sample = next(self.samples())
+		self.assertAlmostEqual(sum(floored.get_odds("Michael Jordan", game_count, sample=sample).values()), 1)
+
+	def test_saved_model_matches(self):
+		model_path = os.path.join(self.directory, "scorer")
+		model = AgentModel(self.predicted_scores, self.data, self.dataset, self.stds, self.names, {name: i for i, name in enumerate(self.names)}, min_std=0.1)
+		self.assertTrue(model.save(model_path))
+		loaded = AgentModel.load(model_path, self.data)
+		self.assertEqual(loaded.get_min_std(), 0.1)
+		for name, game_count, sample in self.samples():
+			self.assertEqual(loaded.get_odds(name, game_count, sample=sample), model.get_odds(name, game_count, sample=sample))
+
+if __name__ == "__main__":
+	unittest.main()
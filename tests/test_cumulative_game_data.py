@@ -0,0 +1,49 @@
+import os, sys, unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from data import CumulativeGameData, GameData, STAT_COLUMNS
+
+STDEV_COLUMNS = {"points": "PTS", "offensive_rebounds": "ORB", "defensive_rebounds": "DRB", "steals": "STL", "assists": "AST", "blocks": "BLK", \
+	"turnovers": "TOV", "personal_fouls": "PF"}
+
+class TestCumulativeGameData(unittest.TestCase):
+
+	def setUp(self):
+		self.games = np.random.default_rng(0).integers(0, 40, size=(300, len(STAT_COLUMNS))).astype(np.float64)
+
+	def assert_matches_lists(self, cumulative_game, games):
+		# the totals and np.std over per-stat lists that CumulativeGameData kept before it streamed its statistics
+		self.assertEqual(cumulative_game.get_num_games(), len(games))
+		self.assertTrue(np.allclose(cumulative_game.get_stats(), games.sum(axis=0)))
+		for name, column in STDEV_COLUMNS.items():
+			self.assertAlmostEqual(cumulative_game.get_stdevs()[name], np.std(list(games[:, STAT_COLUMNS.index(column)])), places=9)
+
+	def test_add_matches_lists(self):
+		cumulative_game = CumulativeGameData()
+		for game in self.games:
+			cumulative_game.add(GameData(None, game))
+		self.assert_matches_lists(cumulative_game, self.games)
+
+	def test_add_batch_matches_lists(self):
+		cumulative_game = CumulativeGameData()
+		for batch in np.array_split(self.games, [1, 50, 51, 200]):
+			cumulative_game.add_batch(batch)
+		self.assert_matches_lists(cumulative_game, self.games)
+
+	def test_mixed_adds_match_lists(self):
+		cumulative_game = CumulativeGameData()
+		cumulative_game.add_batch(self.games[:100])
+		for game in self.games[100:150]:
+			cumulative_game.add(GameData(None, game))
+		cumulative_game.add_batch(self.games[150:])
+		self.assert_matches_lists(cumulative_game, self.games)
+
+	def test_from_moments_matches_lists(self):
+		m2 = ((self.games - self.games.mean(axis=0)) ** 2).sum(axis=0)
+		self.assert_matches_lists(CumulativeGameData.from_moments(len(self.games), self.games.sum(axis=0), m2), self.games)
+
+if __name__ == "__main__":
+	unittest.main()
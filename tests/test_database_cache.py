@@ -0,0 +1,66 @@
+import os, sys, io, json, pickle, shutil, tempfile, contextlib, unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from data import Database
+from rules import Rules
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "config.json")
+
+class TestDatabaseCache(unittest.TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.data_path = os.path.join(self.directory, "games.csv")
+		with open(self.data_path, "w") as f:
+			f.write("NAME,FG,FGA,FT,FTA,ORB,DRB,AST,STL,BLK,TOV,PF,PTS\n")
+			f.write("Michael Jordan,15,25,6,10,2,3,3,6,4,2,3,36\n")
+			f.write("Michael Jordan,11,23,6,9,0,6,7,1,1,3,3,\n")
+			f.write("Larry Bird,10,20,5,5,2,8,7,2,1,3,2,25\n")
+			f.write("Bill Walton,0,30,0,10,0,0,0,0,0,9,6,0\n")
+		self.positions_path = os.path.join(self.directory, "positions.csv")
+		with open(self.positions_path, "w") as f:
+			f.write("Name,Proper\nMichael Jordan,2\nLarry Bird,3\nBill Walton,5\n")
+		self.cache_directory = os.path.join(self.directory, "cache")
+		with open(CONFIG_PATH) as f:
+			self.rules = Rules(json.load(f))
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	def load(self, filepath, cache_directory):
+		with contextlib.redirect_stdout(io.StringIO()):
+			database = Database(filepath, self.rules, self.positions_path, cache_directory=cache_directory)
+		return {name: stop - start for name, (start, stop) in database.player_rows.items()}
+
+	def test_single_path_and_list_are_cached_separately(self):
+		for filepath in [self.data_path, [self.data_path]]:
+			from_csv = self.load(filepath, None)
+			self.load(filepath, self.cache_directory)
+			self.assertEqual(self.load(filepath, self.cache_directory), from_csv)
+
+		self.assertEqual(self.load(self.data_path, self.cache_directory)["Michael Jordan"], 2)
+		self.assertEqual(self.load([self.data_path], self.cache_directory)["Michael Jordan"], 1)
+
+	def test_publish_swaps_in_the_cached_matrix(self):
+		with contextlib.redirect_stdout(io.StringIO()):
+			database = Database(self.data_path, self.rules, self.positions_path, cache_directory=None)
+		games, summary = np.array(database.game_matrix), database.get_summary()
+		database.cache_directory = self.cache_directory
+
+		# nothing already reported at load is reported again
+		out = io.StringIO()
+		with contextlib.redirect_stdout(out):
+			self.assertTrue(database.publish())
+		self.assertEqual(out.getvalue(), "")
+		self.assertIsInstance(database.game_matrix, np.memmap)
+		self.assertTrue(np.array_equal(database.game_matrix, games, equal_nan=True))
+		self.assertIs(database.get_summary(), summary)
+
+		# a published database pickles as a path to the cache rather than the matrix itself
+		self.assertTrue(np.array_equal(pickle.loads(pickle.dumps(database)).game_matrix, games, equal_nan=True))
+
+if __name__ == "__main__":
+	unittest.main()
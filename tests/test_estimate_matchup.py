@@ -0,0 +1,75 @@
+import os, sys, io, json, shutil, tempfile, contextlib, unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from data import Database
+from matchup_center import MatchupCenter
+from participant import Participant
+from player import Player
+from rules import Rules
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "config.json")
+LINEUP_SIZE = 6
+
+class TestEstimateMatchup(unittest.TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		generator = np.random.default_rng(0)
+		names = ["Player {:02d}".format(i) for i in range(2 * LINEUP_SIZE)]
+		data_path = os.path.join(self.directory, "games.csv")
+		with open(data_path, "w") as f:
+			f.write("NAME,FG,FGA,FT,FTA,ORB,DRB,AST,STL,BLK,TOV,PF,PTS\n")
+			for i, name in enumerate(names):
+				for _ in range(20):
+					# the first lineup shoots better, so it should be favoured
+					fg, ft = generator.integers(4 if i < LINEUP_SIZE else 2, 12), generator.integers(0, 8)
+					f.write("{},{},{},{},{},{}\n".format(name, fg, fg + generator.integers(0, 10), ft, ft + generator.integers(0, 3), \
+						",".join(str(stat) for stat in generator.integers(0, 8, size=7)) + ",{}".format(2 * fg + ft)))
+		positions_path = os.path.join(self.directory, "positions.csv")
+		with open(positions_path, "w") as f:
+			f.write("Name,Proper\n" + "".join("{},{}\n".format(name, 1 + (i % 5)) for i, name in enumerate(names)))
+
+		with open(CONFIG_PATH) as f:
+			config = json.load(f)
+		config["Roto"] = False
+		config["Seed"] = 0
+		rules = Rules(config)
+		data = Database(data_path, rules, positions_path, cache_directory=None)
+
+		self.contenders = []
+		for i in range(2):
+			participant = Participant("Contender {}".format(i + 1), rules)
+			for name in names[i * LINEUP_SIZE:(i + 1) * LINEUP_SIZE]:
+				participant.draft_player(Player(name, data.get_player_data(name), 3, roto=rules.is_roto()))
+			self.contenders.append(participant)
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	def test_no_games_is_rejected(self):
+		for number_of_games in [0, -5]:
+			with self.assertRaises(ValueError):
+				MatchupCenter.estimate_matchup(*self.contenders, number_of_games=number_of_games)
+
+	def test_estimate_matches_played_games(self):
+		win_probability, (low, high), (scores, other_scores) = MatchupCenter.estimate_matchup(*self.contenders, number_of_games=2000)
+		self.assertEqual(len(scores), 2000)
+		self.assertTrue(low <= win_probability <= high)
+		self.assertAlmostEqual(win_probability, float(np.mean(scores >= other_scores)))
+
+		# play_game breaks ties the same way, so its win rate should fall inside a slightly widened interval
+		with contextlib.redirect_stdout(io.StringIO()):
+			played = [MatchupCenter.play_game(*self.contenders)[0] == self.contenders[0] for _ in range(2000)]
+		self.assertGreater(win_probability, 0.5)
+		self.assertLess(abs(np.mean(played) - win_probability), 4 * (high - low) / 2)
+
+	def test_estimates_do_not_move_league_streams(self):
+		before = self.contenders[0].get_generator("sampling").bit_generator.state
+		MatchupCenter.estimate_matchup(*self.contenders, number_of_games=100)
+		self.assertEqual(self.contenders[0].get_generator("sampling").bit_generator.state, before)
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,85 @@
+import os, sys, io, json, shutil, tempfile, contextlib, unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+import agent
+from agent_model import AgentModel, NUM_FEATURES
+from data import Database
+from league import League
+from random_streams import RandomStreams
+from rules import Rules
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "config.json")
+
+class TestHeadless(unittest.TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		generator = np.random.default_rng(0)
+		names = ["Player {:02d}".format(i) for i in range(60)]
+		data_path = os.path.join(self.directory, "games.csv")
+		with open(data_path, "w") as f:
+			f.write("NAME,FG,FGA,FT,FTA,ORB,DRB,AST,STL,BLK,TOV,PF,PTS\n")
+			for name in names:
+				for _ in range(20):
+					fg, ft = generator.integers(2, 12), generator.integers(0, 8)
+					f.write("{},{},{},{},{},{}\n".format(name, fg, fg + generator.integers(0, 10), ft, ft + generator.integers(0, 3), \
+						",".join(str(stat) for stat in generator.integers(0, 8, size=7)) + ",{}".format(2 * fg + ft)))
+		positions_path = os.path.join(self.directory, "positions.csv")
+		with open(positions_path, "w") as f:
+			f.write("Name,Proper\n" + "".join("{},{}\n".format(name, 1 + (i % 5)) for i, name in enumerate(names)))
+
+		with open(CONFIG_PATH) as f:
+			config = json.load(f)
+		for participant in config["Participants"]:
+			participant["Autodraft"] = True
+		config["Data Path"] = data_path
+		config["Positional Data Path"] = positions_path
+		config["Allow Injuries"] = True
+		self.config = config
+
+		self.data = Database(data_path, Rules(config), positions_path, cache_directory=None)
+		self.default_model = agent.DEFAULT_MODEL
+		agent.DEFAULT_MODEL = AgentModel({name: float(generator.uniform(10, 50)) for name in names}, self.data, generator.uniform(1, 20, size=(len(names), NUM_FEATURES)), \
+			generator.uniform(0.5, 5, size=(len(names), NUM_FEATURES)), names, {name: i for i, name in enumerate(names)})
+
+	def tearDown(self):
+		agent.DEFAULT_MODEL = self.default_model
+		shutil.rmtree(self.directory)
+
+	def run_league(self, roto, headless):
+		config_path = os.path.join(self.directory, "config.json")
+		config = dict(self.config, Roto=roto)
+		if not roto:
+			# scouting reports under standard scoring are a single number, which the agent model has never been able to score
+			config["Draft Rules"] = [dict(draft_rules, Scouting=False) for draft_rules in config["Draft Rules"]]
+		with open(config_path, "w") as f:
+			json.dump(config, f)
+
+		league = League()
+		out = io.StringIO()
+		with contextlib.redirect_stdout(out):
+			league.load_from_config(config_path, data=self.data, random_streams=RandomStreams(7))
+			league.set_headless(headless)
+			league.start_league()
+			for year in range(2):
+				league.run_draft(year)
+				league.run_season([27, 54])
+				league.run_championship(dramatic=False)
+				league.end_season()
+
+		results = [(participant.get_name(), participant.get_total_results(), participant.get_championships(), participant.get_championships_lost(), \
+			sorted(player.get_name() for player in participant.get_team().get_all_players())) for participant in league.participants]
+		return results, out.getvalue()
+
+	def test_headless_matches_verbose(self):
+		for roto in [True, False]:
+			verbose_results, verbose_output = self.run_league(roto, headless=False)
+			headless_results, headless_output = self.run_league(roto, headless=True)
+			self.assertEqual(headless_results, verbose_results)
+			self.assertLess(len(headless_output), len(verbose_output))
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,82 @@
+import os, sys, json, math, shutil, tempfile, unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from data import Database, PLAY_BY_PLAY_COLUMNS
+from matchup_center import MatchupCenter
+from participant import Participant
+from player import Player
+from rules import Rules
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "config.json")
+LINEUP_SIZE = 6
+
+def agree(first, second):
+	# the two engines draw differently, so their means only have to agree to within sampling error
+	standard_error = math.sqrt((np.var(first) / len(first)) + (np.var(second) / len(second)))
+	return abs(np.mean(first) - np.mean(second)) <= 4 * standard_error + 1e-9
+
+class TestPlayByPlay(unittest.TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		generator = np.random.default_rng(0)
+		names = ["Player {}".format(i) for i in range(2 * LINEUP_SIZE)]
+		data_path = os.path.join(self.directory, "seasons.csv")
+		with open(data_path, "w") as f:
+			f.write("NAME," + ",".join(PLAY_BY_PLAY_COLUMNS) + "\n")
+			for name in names:
+				for _ in range(3):
+					f.write("{},{},{},{},{},{},{},{},{},{}\n".format(name, generator.uniform(10, 35), generator.uniform(0, 0.6), generator.uniform(0.25, 0.42), \
+						generator.uniform(0.42, 0.6), generator.uniform(1, 12), generator.uniform(8, 25), generator.uniform(5, 35), generator.uniform(-2, 2), generator.uniform(8, 16)))
+		positions_path = os.path.join(self.directory, "positions.csv")
+		with open(positions_path, "w") as f:
+			f.write("Name,Proper\n" + "".join("{},{}\n".format(name, 1 + (i % 5)) for i, name in enumerate(names)))
+
+		with open(CONFIG_PATH) as f:
+			config = json.load(f)
+		config["Play-by-play"] = True
+		config["Seed"] = 0
+		rules = Rules(config)
+		data = Database(data_path, rules, positions_path, cache_directory=None)
+
+		self.contenders = []
+		for i in range(2):
+			participant = Participant("Contender {}".format(i + 1), rules)
+			for name in names[i * LINEUP_SIZE:(i + 1) * LINEUP_SIZE]:
+				participant.draft_player(Player(name, data.get_player_data(name), 3, roto=rules.is_roto()))
+			self.contenders.append(participant)
+		self.players = [[player for player in contender.get_team().get_starters()] for contender in self.contenders]
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	def test_batch_matches_scalar_engine(self):
+		number_of_games = 400
+		scalar = [MatchupCenter.play_by_play_game(*self.contenders) for _ in range(number_of_games)]
+		batch_wins, batch_box_scores = MatchupCenter.play_by_play_games(*self.contenders, 4 * number_of_games)
+
+		scalar_wins = [winner == self.contenders[0] for winner, _ in scalar]
+		self.assertTrue(agree(scalar_wins, batch_wins))
+		for side in range(2):
+			self.assertTrue(agree([box_scores[side].score() for _, box_scores in scalar], batch_box_scores[side].score()))
+			for i, player in enumerate(self.players[side]):
+				self.assertTrue(agree([box_scores[side].get_points(player) for _, box_scores in scalar], batch_box_scores[side].get_points()[:, i]))
+				self.assertTrue(agree([box_scores[side].get_rebounds(player) for _, box_scores in scalar], batch_box_scores[side].get_rebounds()[:, i]))
+				self.assertTrue(agree([box_scores[side].get_assists(player) for _, box_scores in scalar], batch_box_scores[side].get_assists()[:, i]))
+
+	def test_batch_box_scores(self):
+		wins, box_scores = MatchupCenter.play_by_play_games(*self.contenders, 50)
+		self.assertEqual(len(wins), 50)
+		self.assertTrue(np.array_equal(wins, box_scores[0].score() > box_scores[1].score()))
+		for side in range(2):
+			self.assertEqual(len(box_scores[side]), 50)
+			box_score = box_scores[side].get_box_score(7)
+			self.assertEqual(box_score.score(), box_scores[side].score()[7])
+			for i, player in enumerate(self.players[side]):
+				self.assertEqual(box_score.get_points(player), box_scores[side].get_points()[7, i])
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,65 @@
+import os, sys, json, shutil, tempfile, unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from data import Database
+from random_streams import RandomStreams, STREAM_NAMES
+from rules import Rules
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "config.json")
+
+def draws(streams, name, size=20):
+	return streams.get(name).integers(1_000_000, size=size)
+
+class TestRandomStreams(unittest.TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.data_path = os.path.join(self.directory, "games.csv")
+		with open(self.data_path, "w") as f:
+			f.write("NAME,FG,FGA,FT,FTA,ORB,DRB,AST,STL,BLK,TOV,PF,PTS\n")
+			for i in range(30):
+				f.write("Michael Jordan,{},25,6,10,2,3,3,6,4,2,3,{}\n".format(i % 15, 2 * (i % 15) + 6))
+		self.positions_path = os.path.join(self.directory, "positions.csv")
+		with open(self.positions_path, "w") as f:
+			f.write("Name,Proper\nMichael Jordan,2\n")
+		with open(CONFIG_PATH) as f:
+			self.config = json.load(f)
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	def sample(self, seed):
+		config = dict(self.config)
+		config["Seed"] = seed
+		database = Database(self.data_path, Rules(config), self.positions_path, cache_directory=None)
+		return database.get_player_data("Michael Jordan").sample_games(50)
+
+	def test_seeded_streams_repeat(self):
+		for name in STREAM_NAMES:
+			self.assertTrue(np.array_equal(draws(RandomStreams(7), name), draws(RandomStreams(7), name)))
+		self.assertFalse(np.array_equal(draws(RandomStreams(7), "sampling"), draws(RandomStreams(8), "sampling")))
+
+	def test_unseeded_streams_differ(self):
+		self.assertFalse(np.array_equal(draws(RandomStreams(), "sampling"), draws(RandomStreams(), "sampling")))
+		self.assertFalse(np.array_equal(self.sample(None), self.sample(None)))
+
+	def test_streams_are_independent(self):
+		untouched, touched = RandomStreams(7), RandomStreams(7)
+		draws(touched, "injuries", size=1000)
+		self.assertTrue(np.array_equal(draws(untouched, "sampling"), draws(touched, "sampling")))
+
+	def test_worker_streams(self):
+		parent = RandomStreams(7)
+		self.assertTrue(np.array_equal(draws(parent.for_worker(3), "sampling"), draws(RandomStreams(7).for_worker(3), "sampling")))
+		self.assertFalse(np.array_equal(draws(parent.for_worker(3), "sampling"), draws(parent.for_worker(4), "sampling")))
+		self.assertFalse(np.array_equal(draws(parent.for_worker(0), "sampling"), draws(RandomStreams(7), "sampling")))
+
+	def test_seeded_database_sampling_repeats(self):
+		self.assertTrue(np.array_equal(self.sample(7), self.sample(7)))
+		self.assertFalse(np.array_equal(self.sample(7), self.sample(8)))
+
+if __name__ == "__main__":
+	unittest.main()
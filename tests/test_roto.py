@@ -0,0 +1,83 @@
+import os, sys, json, unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from data import GameData, RotoGameData, ROTO_CATEGORIES, STAT_COLUMNS
+from rules import Rules
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "config.json")
+
+def roto_value(first, second):
+	return 1 if first > second else (0.5 if first == second else 0)
+
+def percentage(made, attempts):
+	return made / attempts if attempts else 0
+
+# the per-category comparison GameData.roto_score made before it was vectorized
+def scalar_category_wins(game, other):
+	return [
+		roto_value(game.get_points(), other.get_points()),
+		roto_value(percentage(game.get_field_goals(), game.get_field_goal_attempts()), percentage(other.get_field_goals(), other.get_field_goal_attempts())),
+		roto_value(percentage(game.get_free_throws(), game.get_free_throw_attempts()), percentage(other.get_free_throws(), other.get_free_throw_attempts())),
+		roto_value(game.get_offensive_rebounds(), other.get_offensive_rebounds()),
+		roto_value(game.get_defensive_rebounds(), other.get_defensive_rebounds()),
+		roto_value(game.get_steals(), other.get_steals()),
+		roto_value(game.get_assists(), other.get_assists()),
+		roto_value(game.get_blocks(), other.get_blocks()),
+		roto_value(game.get_turnovers(), other.get_turnovers()),
+		roto_value(game.get_personal_fouls(), other.get_personal_fouls())
+	]
+
+def scalar_roto_score(scoring_rules, game, other):
+	coefficients = [scoring_rules.points_coeff(), scoring_rules.field_goals_coeff(), scoring_rules.free_throws_coeff(), scoring_rules.offensive_rebounds_coeff(), \
+		scoring_rules.defensive_rebounds_coeff(), scoring_rules.steals_coeff(), scoring_rules.assists_coeff(), scoring_rules.blocks_coeff(), \
+		scoring_rules.turnovers_coeff(), scoring_rules.personal_fouls_coeff()]
+	return sum(win * coefficient for win, coefficient in zip(scalar_category_wins(game, other), coefficients))
+
+class TestRoto(unittest.TestCase):
+
+	def setUp(self):
+		with open(CONFIG_PATH) as f:
+			self.scoring_rules = Rules(json.load(f)).get_scoring_rules()
+
+		# small stat ranges so ties and zero attempts both come up often
+		generator = np.random.default_rng(0)
+		self.games = generator.integers(0, 4, size=(500, len(STAT_COLUMNS))).astype(np.float64)
+		self.other_games = generator.integers(0, 4, size=(500, len(STAT_COLUMNS))).astype(np.float64)
+		self.games[::7] = self.other_games[::7]
+
+	def pairs(self):
+		for game, other in zip(self.games, self.other_games):
+			yield GameData(self.scoring_rules, game), GameData(self.scoring_rules, other)
+
+	def test_score_matches_scalar(self):
+		for game, other in self.pairs():
+			self.assertAlmostEqual(game.score(other, roto=True), scalar_roto_score(self.scoring_rules, game, other))
+
+	def test_batch_matches_scalar(self):
+		expected = [scalar_roto_score(self.scoring_rules, game, other) for game, other in self.pairs()]
+		self.assertTrue(np.allclose(GameData.roto_score_batch(self.scoring_rules, self.games, self.other_games), expected))
+
+	def test_category_wins_are_complementary(self):
+		category_wins, other_category_wins = GameData.roto_category_wins(self.games, self.other_games)
+		self.assertTrue(np.array_equal(category_wins, [scalar_category_wins(game, other) for game, other in self.pairs()]))
+		self.assertTrue(np.array_equal(other_category_wins, [scalar_category_wins(other, game) for game, other in self.pairs()]))
+
+	def test_roto_totals_match_scalar(self):
+		one_by_one, batched = RotoGameData(self.scoring_rules), RotoGameData(self.scoring_rules)
+		for game, other in self.pairs():
+			one_by_one.add(game, other)
+		category_wins, _ = GameData.roto_category_wins(self.games, self.other_games)
+		batched.add_batch(GameData.roto_categories(self.games), category_wins)
+
+		expected_wins = np.sum([scalar_category_wins(game, other) for game, other in self.pairs()], axis=0)
+		self.assertEqual(len(expected_wins), len(ROTO_CATEGORIES))
+		for totals in [one_by_one, batched]:
+			self.assertTrue(np.array_equal(totals.get_win_totals(), expected_wins))
+			self.assertEqual(totals.get_num_games(), len(self.games))
+		self.assertTrue(np.allclose(one_by_one.get_totals(), batched.get_totals()))
+
+if __name__ == "__main__":
+	unittest.main()
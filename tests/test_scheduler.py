@@ -0,0 +1,74 @@
+import os, sys, io, contextlib, unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from collections import Counter
+from scheduler import Scheduler, Event
+
+def games_per_participant(events):
+	counts = Counter()
+	for event_type, (first, second) in events:
+		if event_type == Event.GAME:
+			counts[first] += 1
+			counts[second] += 1
+	return counts
+
+class TestScheduler(unittest.TestCase):
+
+	def schedule(self, number_of_participants, number_of_breaks, season_length):
+		with contextlib.redirect_stdout(io.StringIO()):
+			return list(Scheduler.schedule(["team {}".format(i) for i in range(number_of_participants)], number_of_breaks, season_length))
+
+	def test_every_team_plays_the_season(self):
+		for number_of_participants in [2, 4, 5, 8, 10, 30]:
+			for season_length in [10, 82]:
+				counts = games_per_participant(self.schedule(number_of_participants, 2, season_length))
+				self.assertEqual(len(counts), number_of_participants)
+				self.assertEqual(set(counts.values()), {season_length})
+
+	def test_odd_field_and_odd_length_plays_one_extra_game(self):
+		out = io.StringIO()
+		Scheduler.plan.cache_clear()
+		with contextlib.redirect_stdout(out):
+			counts = games_per_participant(Scheduler.schedule(["a", "b", "c", "d", "e"], 2, 81))
+		self.assertEqual(set(counts.values()), {82})
+		self.assertIn("Warn:", out.getvalue())
+
+	def test_breaks(self):
+		events = self.schedule(10, 2, 82)
+		self.assertEqual(sum(event_type == Event.SEASON_BREAK for event_type, _ in events), 2)
+		self.assertNotEqual(events[-1][0], Event.SEASON_BREAK)
+
+		# a break only comes once every team has reached its break point
+		games = Counter()
+		break_points = [27, 54]
+		for event_type, (first, second) in events:
+			if event_type == Event.GAME:
+				games[first] += 1
+				games[second] += 1
+			else:
+				self.assertGreaterEqual(min(games.values()), break_points.pop(0))
+
+	def test_teams_never_play_themselves(self):
+		for event_type, (first, second) in self.schedule(7, 2, 20):
+			if event_type == Event.GAME:
+				self.assertNotEqual(first, second)
+
+	def test_repeated_schedules_match(self):
+		Scheduler.plan.cache_clear()
+		first, second = Scheduler.schedule(list("abcdef"), 2, 40), Scheduler.schedule(list("abcdef"), 2, 40)
+
+		# interleaved, so the second season replays events while the first is still generating them
+		first_events, second_events = [], []
+		for event in first:
+			first_events.append(event)
+			second_events.append(next(second))
+		second_events.extend(second)
+		self.assertEqual(first_events, second_events)
+		participants = list("abcdef")
+		fresh = [(event_type, (participants[first], participants[second]) if event_type == Event.GAME else (None, None)) \
+			for event_type, first, second in Scheduler.generate_plan(6, 2, 40)]
+		self.assertEqual(first_events, fresh)
+
+if __name__ == "__main__":
+	unittest.main()
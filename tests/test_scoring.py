@@ -0,0 +1,53 @@
+import os, sys, json, unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from data import GameData, STAT_COLUMNS
+from rules import Rules
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "config.json")
+
+# the sum of getter-times-coefficient terms GameData.standard_score computed before scoring was batched
+def scalar_score(scoring_rules, game):
+	return (game.get_points() * scoring_rules.points_coeff()) + \
+		(game.get_field_goals() * scoring_rules.field_goals_coeff()) + \
+		(game.get_field_goal_attempts() * scoring_rules.field_goal_attempts_coeff()) + \
+		(game.get_free_throws() * scoring_rules.free_throws_coeff()) + \
+		(game.get_free_throw_attempts() * scoring_rules.free_throw_attempts_coeff()) + \
+		(game.get_offensive_rebounds() * scoring_rules.offensive_rebounds_coeff()) + \
+		(game.get_defensive_rebounds() * scoring_rules.defensive_rebounds_coeff()) + \
+		(game.get_steals() * scoring_rules.steals_coeff()) + \
+		(game.get_assists() * scoring_rules.assists_coeff()) + \
+		(game.get_blocks() * scoring_rules.blocks_coeff()) + \
+		(game.get_turnovers() * scoring_rules.turnovers_coeff()) + \
+		(game.get_personal_fouls() * scoring_rules.personal_fouls_coeff())
+
+class TestScoring(unittest.TestCase):
+
+	def setUp(self):
+		with open(CONFIG_PATH) as f:
+			config = json.load(f)
+		config["Roto"] = False
+		config["Seed"] = 0
+		self.scoring_rules = Rules(config).get_scoring_rules()
+		self.games = np.random.default_rng(0).integers(0, 40, size=(500, len(STAT_COLUMNS))).astype(np.float64)
+
+	def test_batch_matches_scalar(self):
+		expected = [scalar_score(self.scoring_rules, GameData(self.scoring_rules, game)) for game in self.games]
+		self.assertTrue(np.allclose(GameData.score_batch(self.scoring_rules, self.games), expected, rtol=1e-12))
+
+	def test_single_game_matches_batch(self):
+		batch = GameData.score_batch(self.scoring_rules, self.games)
+		for game, score in zip(self.games, batch):
+			self.assertEqual(GameData(self.scoring_rules, game).score(), score)
+
+	def test_validity_matches_scalar(self):
+		self.games[::5] *= -1
+		self.games[1] = np.nan
+		expected = [GameData(self.scoring_rules, game).is_valid() for game in self.games]
+		self.assertEqual(GameData.valid_batch(self.scoring_rules, self.games).tolist(), expected)
+
+if __name__ == "__main__":
+	unittest.main()
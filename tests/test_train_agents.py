@@ -0,0 +1,88 @@
+import os, sys, json, shutil, tempfile, unittest, multiprocessing
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+import agent, train_agents
+from agent_model import AgentModel, NUM_FEATURES
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from data import Database
+from random_streams import RandomStreams
+from rules import Rules
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "config.json")
+NUMBER_OF_LEAGUES = 4
+
+class TestTrainAgents(unittest.TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		generator = np.random.default_rng(0)
+		names = ["Player {:02d}".format(i) for i in range(60)]
+		data_path = os.path.join(self.directory, "games.csv")
+		with open(data_path, "w") as f:
+			f.write("NAME,FG,FGA,FT,FTA,ORB,DRB,AST,STL,BLK,TOV,PF,PTS\n")
+			for name in names:
+				for _ in range(20):
+					fg, ft = generator.integers(2, 12), generator.integers(0, 8)
+					f.write("{},{},{},{},{},{}\n".format(name, fg, fg + generator.integers(0, 10), ft, ft + generator.integers(0, 3), \
+						",".join(str(stat) for stat in generator.integers(0, 8, size=7)) + ",{}".format(2 * fg + ft)))
+		positions_path = os.path.join(self.directory, "positions.csv")
+		with open(positions_path, "w") as f:
+			f.write("Name,Proper\n" + "".join("{},{}\n".format(name, 1 + (i % 5)) for i, name in enumerate(names)))
+
+		with open(CONFIG_PATH) as f:
+			config = json.load(f)
+		for participant in config["Participants"]:
+			participant["Autodraft"] = True
+		config["Data Path"] = data_path
+		config["Positional Data Path"] = positions_path
+		self.config_path = os.path.join(self.directory, "config.json")
+		with open(self.config_path, "w") as f:
+			json.dump(config, f)
+
+		data = Database(data_path, Rules(config), positions_path, cache_directory=None)
+		self.default_model = agent.DEFAULT_MODEL
+		agent.DEFAULT_MODEL = AgentModel({name: float(generator.uniform(10, 50)) for name in names}, data, generator.uniform(1, 20, size=(len(names), NUM_FEATURES)), \
+			generator.uniform(0.5, 5, size=(len(names), NUM_FEATURES)), names, {name: i for i, name in enumerate(names)})
+		self.shared = {"config_path": self.config_path, "data": data, "random_streams": RandomStreams(7), "verbose": False}
+
+	def tearDown(self):
+		agent.DEFAULT_MODEL = self.default_model
+		train_agents.SHARED.clear()
+		shutil.rmtree(self.directory)
+
+	def serial_results(self):
+		train_agents.share(self.shared)
+		return {league_number: results for league_number, results in map(train_agents.run_league, range(NUMBER_OF_LEAGUES))}
+
+	def test_leagues_repeat(self):
+		results = self.serial_results()
+		self.assertEqual(results, self.serial_results())
+		self.assertNotEqual(results[0], results[1])
+		self.assertEqual(train_agents.run_league(2), (2, self.serial_results()[2]))
+
+	@unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "workers share the database by forking")
+	def test_parallel_matches_serial(self):
+		serial = self.serial_results()
+		parallel = {}
+		with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("fork"), initializer=train_agents.share, initargs=(self.shared,)) as executor:
+			for future in as_completed([executor.submit(train_agents.run_league, league_number) for league_number in range(NUMBER_OF_LEAGUES)]):
+				league_number, results = future.result()
+				parallel[league_number] = results
+		self.assertEqual(parallel, serial)
+
+		serial_results, parallel_results = train_agents.ResultsAggregator(), train_agents.ResultsAggregator()
+		for league_number in range(NUMBER_OF_LEAGUES):
+			serial_results.add(league_number, serial[league_number])
+		for league_number in reversed(range(NUMBER_OF_LEAGUES)):
+			parallel_results.add(league_number, parallel[league_number])
+		self.assertEqual(parallel_results.number_of_leagues, NUMBER_OF_LEAGUES)
+		self.assertEqual(parallel_results.championships, serial_results.championships)
+		self.assertEqual(parallel_results.finals_lost, serial_results.finals_lost)
+		self.assertEqual({name: sorted(rankings) for name, rankings in parallel_results.rankings.items()}, \
+			{name: sorted(rankings) for name, rankings in serial_results.rankings.items()})
+
+if __name__ == "__main__":
+	unittest.main()
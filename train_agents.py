@@ -1,6 +1,14 @@
 from agent_model import AgentModel
 from league import League
-import re, json, pickle, argparse, sys
+from agent import get_default_model
+from data import Database
+from rules import Rules
+from random_streams import RandomStreams
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import re, json, pickle, argparse, sys, os, multiprocessing
+
+# filled in once in the parent; forked workers inherit it, so the game logs and agent model are loaded a single time
+SHARED = {}
 
 def save_game(league, save_path):
 	with open(save_path, "wb") as f:
@@ -11,22 +19,83 @@ def load_game(load_path):
 		league = pickle.load(f)
 	return league
 
+def share(shared):
+	SHARED.update(shared)
+
+def run_league(league_number):
+	# each league gets the streams keyed on its number, so results do not depend on how leagues are spread over workers
+	league = League()
+	league.load_from_config(SHARED["config_path"], data=SHARED["data"], random_streams=SHARED["random_streams"].for_worker(league_number))
+	league.set_headless(not SHARED["verbose"])
+	league.start_league()
+
+	league.run_draft(0)
+	league.run_season([27, 54])
+	league.run_championship(dramatic=True)
+	league.end_season()
+
+	return league_number, {participant.get_name(): (participant.get_total_results()[-1], participant.get_championships(), participant.get_championships_lost()) \
+		for participant in league.participants}
+
+class ResultsAggregator:
+
+	def __init__(self):
+		self.number_of_leagues = 0
+		self.rankings = {}
+		self.championships = {}
+		self.finals_lost = {}
+
+	def add(self, league_number, results):
+		self.number_of_leagues += 1
+		for name, (ranking, championships, finals_lost) in results.items():
+			self.rankings.setdefault(name, []).append(ranking)
+			self.championships[name] = self.championships.get(name, 0) + championships
+			self.finals_lost[name] = self.finals_lost.get(name, 0) + finals_lost
+
+	def display(self):
+		print("\nResults over {} leagues".format(self.number_of_leagues))
+		for name in sorted(self.rankings, key=lambda name: (-self.championships[name], name)):
+			print("{}: {} titles, {} finals lost, average finish {}".format(name, self.championships[name], self.finals_lost[name], \
+				round(sum(self.rankings[name]) / len(self.rankings[name]), 2)))
+
 
 if __name__ == "__main__":
-	
+
 	parser = argparse.ArgumentParser()
 	parser.add_argument("--num_seasons", type=int, default=1_000)
+	parser.add_argument("--config", type=str, default="./config.json")
+	parser.add_argument("--workers", type=int, default=os.cpu_count())
+	parser.add_argument("--seed", type=int, default=None)
+	parser.add_argument("--verbose", action="store_true", default=False)
 	args = parser.parse_args()
 
-	for year in range(args.num_seasons):
+	with open(args.config) as f:
+		json_obj = json.load(f)
+	random_streams = RandomStreams(args.seed if args.seed != None else json_obj.get("Seed"))
+	print("Seed: {}".format(random_streams.get_seed()))
+
+	data = Database(json_obj["Data Path"], Rules(json_obj), json_obj["Positional Data Path"])
+	data.publish()
+	# agents load their model lazily, so it is loaded here once for the forked workers to share
+	get_default_model()
 
-		league = League()
-		league.load_from_config()
-		league.start_league()
+	shared = {
+		"config_path": args.config,
+		"data": data,
+		"random_streams": random_streams,
+		"verbose": args.verbose
+	}
 
-		league.run_draft(0)
-		league.run_season([27, 54])
-		league.run_championship(dramatic=True)
-		league.end_season()
+	results = ResultsAggregator()
+	if args.workers <= 1:
+		share(shared)
+		for league_number in range(args.num_seasons):
+			results.add(*run_league(league_number))
+	else:
+		context = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+		with ProcessPoolExecutor(max_workers=args.workers, mp_context=context, initializer=share, initargs=(shared,)) as executor:
+			futures = [executor.submit(run_league, league_number) for league_number in range(args.num_seasons)]
+			for future in as_completed(futures):
+				results.add(*future.result())
 
-	league.save_agents()
+	results.display()